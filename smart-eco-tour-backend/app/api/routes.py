@@ -1,6 +1,8 @@
 """FastAPI routes for the Eco-Tour backend."""
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from typing import Dict, List, Optional, Tuple
 from app.models.schemas import (
     TripInput,
     Itinerary,
@@ -8,22 +10,74 @@ from app.models.schemas import (
     GroupMatch,
     TransportMode,
     ActivityType,
+    JobStatus,
 )
-from app.services.matching import generate_multiple_itineraries
+from app.config import (
+    BATCH_LLM_CONCURRENCY,
+    BATCH_MAX_ITEMS,
+    BULK_INGEST_BATCH_SIZE,
+    GROUP_SEARCH_BEAM_WIDTH,
+    GROUP_SEARCH_CANDIDATES,
+    GROUP_SEARCH_TIME_BUDGET,
+    ITINERARY_CACHE_MAX_BYTES,
+    ITINERARY_CACHE_MAX_SIZE,
+    ITINERARY_CACHE_TTL,
+    ITINERARY_PAGE_MAX,
+    ITINERARY_PAGE_SIZE,
+    JOB_MAX_WAIT,
+    JOB_QUEUE_MAX_SIZE,
+    JOB_TTL,
+    JOB_WORKERS,
+    MAX_GROUP_SIZE,
+    TRAVELER_ANN_ENABLED,
+    TRAVELER_NEIGHBOURS_K,
+    TRAVELER_PAGE_MAX,
+    TRAVELER_PAGE_SIZE,
+    TRAVELER_VECTOR_DTYPE,
+)
+from app.services.grouping import form_groups
+from app.services.itinerary_store import ItineraryStore
+from app.services.jobs import JobQueue, QueueFullError
+from app.services.travelers import TravelerStore
+from app.services.matching import generate_multiple_itineraries_async, stream_itineraries
+from app.services.llm import LLM_CACHE
 from app.utils.similarity import (
+    best_group_subset,
     create_profile_vector,
+    create_profile_vectors,
     find_similar_travelers,
     calculate_group_compatibility,
+    interest_jaccard_many,
+    interest_mask,
+    interests_in_mask,
     recommend_group_size,
 )
+from app.utils.concurrency import SingleFlight, run_cpu_bound, run_store_bound
+from app.utils.ids import id_timestamp
+import asyncio
+import functools
+import json
+import operator
 import random
 import string
 
 router = APIRouter(prefix="/api", tags=["eco-tour"])
 
 # In-memory database for demo
-TRAVELER_DATABASE: dict = {}
-ITINERARY_CACHE: dict = {}
+TRAVELER_DATABASE = TravelerStore(
+    ann_enabled=TRAVELER_ANN_ENABLED,
+    neighbours_k=TRAVELER_NEIGHBOURS_K,
+    vector_dtype=TRAVELER_VECTOR_DTYPE,
+)
+TOP_MATCHES = 5  # matches returned by /find-group
+ITINERARY_CACHE = ItineraryStore(
+    max_size=ITINERARY_CACHE_MAX_SIZE,
+    ttl_seconds=ITINERARY_CACHE_TTL,
+    max_bytes=ITINERARY_CACHE_MAX_BYTES,
+)
+
+# Identical concurrent generate requests share one computation
+GENERATION_FLIGHTS = SingleFlight()
 
 
 @router.post("/generate-itinerary")
@@ -42,7 +96,321 @@ async def generate_itinerary_endpoint(
     """
     try:
         print(f"🚀 Entered generate_itinerary_endpoint: {trip_input.origin} -> {trip_input.destination}")
-        itineraries = generate_multiple_itineraries(
+        _, serialized_itineraries = await _generate_for_trip(trip_input, num_options)
+        
+        print(f"✅ Returning {len(serialized_itineraries)} itineraries to frontend")
+        
+        return _itinerary_response(trip_input, serialized_itineraries)
+    except Exception as e:
+        import traceback
+        print(f"❌ Error in generate_itinerary_endpoint: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/generate-itinerary/stream")
+async def stream_itinerary_endpoint(
+    trip_input: TripInput,
+    num_options: int = Query(3, ge=1, le=5),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+) -> StreamingResponse:
+    """Stream sustainable itineraries for a trip as each one is ready.
+    
+    Emits one ``itinerary`` event per option (each including its
+    sustainability breakdown), template-based options first. When the LLM
+    returns, the first option is re-sent with ``llm_enhanced: true`` and
+    the same id. A final ``done`` event closes the stream.
+    
+    Args:
+        trip_input: User's trip preferences
+        num_options: Number of itinerary options (1-5)
+        format: ``ndjson`` (one JSON object per line) or ``sse``
+        
+    Returns:
+        Streaming response of itinerary events
+    """
+    print(f"🚀 Entered stream_itinerary_endpoint: {trip_input.origin} -> {trip_input.destination}")
+    
+    async def events():
+        itineraries: List[Optional[Itinerary]] = [None] * num_options
+        # Encoded size of each option's latest event; json.dumps escapes
+        # non-ASCII text, so characters are bytes
+        sizes = [0] * num_options
+        try:
+            async for index, itinerary, llm_enhanced in stream_itineraries(
+                origin=trip_input.origin,
+                destination=trip_input.destination,
+                days=trip_input.days,
+                transport_preference=trip_input.transport_preference,
+                interests=trip_input.interests,
+                count=num_options,
+            ):
+                itineraries[index] = itinerary
+                encoded = _encode_event({
+                    "event": "itinerary",
+                    "index": index,
+                    "llm_enhanced": llm_enhanced,
+                    "itinerary": itinerary.model_dump(mode='json'),
+                }, format)
+                sizes[index] = len(encoded)
+                yield encoded
+            
+            # Cache for later use
+            ITINERARY_CACHE.put(_itinerary_cache_key(trip_input), sorted(
+                itineraries,
+                key=lambda x: x.sustainability.total_score,
+                reverse=True,
+            ), size_bytes=sum(sizes))
+            yield _encode_event({"event": "done", "count": num_options}, format)
+        except Exception as e:
+            print(f"❌ Error in stream_itinerary_endpoint: {e}")
+            yield _encode_event({"event": "error", "detail": str(e)}, format)
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type)
+
+
+def _interest_mask_of(profile: TravelerProfile) -> int:
+    """Get a profile's interest bitmask, computing it if it was never set."""
+    if profile.interest_mask is None:
+        profile.interest_mask = interest_mask(profile.interests)
+    return profile.interest_mask
+
+
+async def _in_store(func, *args, **kwargs):
+    """Run a traveler store operation on the store executor under the store lock.
+    
+    Bulk writes can take a while, so they run off the event loop; reads go
+    through the same lock so they never see a write half-applied. The store
+    has its own executor, so none of this queues behind itinerary generation.
+    """
+    return await run_store_bound(TRAVELER_DATABASE.locked, func, *args, **kwargs)
+
+
+def _serialize_itineraries(itineraries: List[Itinerary]) -> Tuple[List[dict], int]:
+    """Serialize itineraries for a response and measure their JSON size.
+    
+    Runs on the executor, so the itinerary cache never has to serialize
+    on the event loop just to account for memory.
+    
+    Args:
+        itineraries: Generated itineraries
+        
+    Returns:
+        Tuple of (serialized itineraries, encoded JSON size in bytes)
+    """
+    serialized = [itinerary.model_dump(mode='json') for itinerary in itineraries]
+    return serialized, len(to_json(serialized))
+
+
+def _encode_event(event: dict, format: str = "ndjson") -> str:
+    """Encode a stream event as an NDJSON line or a Server-Sent Event."""
+    data = json.dumps(event)
+    if format == "sse":
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+@router.post("/generate-itinerary/batch")
+async def batch_itinerary_endpoint(
+    trips: List[TripInput],
+    num_options: int = Query(3, ge=1, le=5),
+) -> StreamingResponse:
+    """Generate itineraries for many trips in one call.
+    
+    Identical trips in the batch are generated once and their result is
+    reported for every matching index; distinct trips are generated
+    independently. At most BATCH_LLM_CONCURRENCY trips
+    (and so LLM calls) run at a time. Results are streamed as NDJSON in
+    completion order, one ``result`` or ``error`` event per input trip,
+    followed by a ``done`` event.
+    
+    Args:
+        trips: List of trip inputs
+        num_options: Number of itinerary options per trip (1-5)
+        
+    Returns:
+        Streaming NDJSON response of per-trip results
+    """
+    if len(trips) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(trips)} trips (max {BATCH_MAX_ITEMS})",
+        )
+    
+    print(f"🚀 Entered batch_itinerary_endpoint: {len(trips)} trips")
+    
+    # Group duplicate trips so each distinct trip is generated once
+    indices_by_key: Dict[str, List[int]] = {}
+    for index, trip_input in enumerate(trips):
+        indices_by_key.setdefault(_trip_key(trip_input, num_options), []).append(index)
+    
+    semaphore = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+    
+    async def generate(indices: List[int]) -> Tuple[List[int], Optional[dict], Optional[str]]:
+        trip_input = trips[indices[0]]
+        async with semaphore:
+            try:
+                _, serialized_itineraries = await _generate_for_trip(trip_input, num_options)
+                return indices, _itinerary_response(trip_input, serialized_itineraries), None
+            except Exception as e:
+                print(f"❌ Batch item {indices[0]} failed: {e}")
+                return indices, None, str(e)
+    
+    async def events():
+        tasks = [asyncio.ensure_future(generate(indices)) for indices in indices_by_key.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                indices, result, error = await next_done
+                for index in indices:
+                    if error is None:
+                        yield _encode_event({"event": "result", "index": index, "result": result})
+                    else:
+                        yield _encode_event({"event": "error", "index": index, "detail": error})
+            
+            yield _encode_event({
+                "event": "done",
+                "count": len(trips),
+                "unique_trips": len(indices_by_key),
+            })
+        finally:
+            # Stop outstanding work if the client disconnects
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.post("/jobs/generate-itinerary", status_code=202)
+async def submit_itinerary_job(
+    trip_input: TripInput,
+    num_options: int = Query(3, ge=1, le=5),
+) -> dict:
+    """Queue itinerary generation as a background job.
+    
+    Returns immediately with a job id; poll ``/api/jobs/{job_id}`` for
+    status and fetch ``/api/jobs/{job_id}/result`` once it has succeeded.
+    
+    Args:
+        trip_input: User's trip preferences
+        num_options: Number of itinerary options (1-5)
+        
+    Returns:
+        Job id and initial status
+    """
+    try:
+        job = JOB_QUEUE.submit((trip_input, num_options))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    return {
+        "status": "accepted",
+        **job.to_dict(),
+        "status_url": f"/api/jobs/{job.id}",
+        "result_url": f"/api/jobs/{job.id}/result",
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=JOB_MAX_WAIT),
+) -> dict:
+    """Get the status of a background job.
+    
+    Args:
+        job_id: Job id returned on submission
+        wait: Seconds to long-poll for the job to finish (0 returns immediately)
+        
+    Returns:
+        Job status
+    """
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    job = await JOB_QUEUE.wait(job, wait)
+    return {"status": "success", **job.to_dict()}
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str) -> dict:
+    """Get the itineraries produced by a finished background job.
+    
+    Args:
+        job_id: Job id returned on submission
+        
+    Returns:
+        Same payload as /api/generate-itinerary
+    """
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    
+    return job.result
+
+
+async def _run_generation_job(payload: Tuple[TripInput, int]) -> dict:
+    """Job handler: generate itineraries for a queued trip."""
+    trip_input, num_options = payload
+    _, serialized_itineraries = await _generate_for_trip(trip_input, num_options)
+    return _itinerary_response(trip_input, serialized_itineraries)
+
+
+JOB_QUEUE = JobQueue(
+    handler=_run_generation_job,
+    workers=JOB_WORKERS,
+    max_queue_size=JOB_QUEUE_MAX_SIZE,
+    ttl_seconds=JOB_TTL,
+)
+
+
+def _itinerary_response(trip_input: TripInput, serialized_itineraries: List[dict]) -> dict:
+    """Build the generate-itinerary response body."""
+    return {
+        "status": "success",
+        "origin": trip_input.origin,
+        "destination": trip_input.destination,
+        "days": trip_input.days,
+        "itineraries": serialized_itineraries,
+        "message": f"Generated {len(serialized_itineraries)} sustainable itinerary options",
+    }
+
+
+def _trip_key(trip_input: TripInput, num_options: int) -> str:
+    """Build a canonical key identifying an itinerary generation request."""
+    return json.dumps(
+        {"trip": trip_input.model_dump(mode="json"), "num_options": num_options},
+        sort_keys=True,
+    )
+
+
+def _itinerary_cache_key(trip_input: TripInput) -> str:
+    """Build the itinerary cache key of a trip."""
+    return f"{trip_input.origin}_{trip_input.destination}_{trip_input.days}"
+
+
+async def _generate_for_trip(
+    trip_input: TripInput,
+    num_options: int,
+) -> Tuple[List[Itinerary], List[dict]]:
+    """Generate, cache and serialize itineraries for a trip.
+    
+    Identical concurrent requests share a single in-flight generation.
+    
+    Args:
+        trip_input: User's trip preferences
+        num_options: Number of itinerary options
+        
+    Returns:
+        Tuple of (itineraries, serialized itineraries)
+    """
+    async def generate() -> Tuple[List[Itinerary], List[dict]]:
+        itineraries = await generate_multiple_itineraries_async(
             origin=trip_input.origin,
             destination=trip_input.destination,
             days=trip_input.days,
@@ -51,29 +419,15 @@ async def generate_itinerary_endpoint(
             count=num_options,
         )
         
-        # Cache for later use
-        cache_key = f"{trip_input.origin}_{trip_input.destination}_{trip_input.days}"
-        ITINERARY_CACHE[cache_key] = itineraries
-        
         # Serialize itineraries to dicts for proper JSON response
         print(f"📦 Serializing {len(itineraries)} itineraries...")
-        serialized_itineraries = [itinerary.model_dump(mode='json') for itinerary in itineraries]
-        
-        print(f"✅ Returning {len(serialized_itineraries)} itineraries to frontend")
+        serialized_itineraries, size_bytes = await run_cpu_bound(_serialize_itineraries, itineraries)
         
-        return {
-            "status": "success",
-            "origin": trip_input.origin,
-            "destination": trip_input.destination,
-            "days": trip_input.days,
-            "itineraries": serialized_itineraries,
-            "message": f"Generated {len(itineraries)} sustainable itinerary options",
-        }
-    except Exception as e:
-        import traceback
-        print(f"❌ Error in generate_itinerary_endpoint: {e}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+        # Cache for later use
+        ITINERARY_CACHE.put(_itinerary_cache_key(trip_input), itineraries, size_bytes=size_bytes)
+        return itineraries, serialized_itineraries
+    
+    return await GENERATION_FLIGHTS.do(_trip_key(trip_input, num_options), generate)
 
 
 @router.get("/itinerary/{itinerary_id}")
@@ -86,16 +440,49 @@ async def get_itinerary_details(itinerary_id: int) -> dict:
     Returns:
         Detailed itinerary information with day-by-day breakdown
     """
-    # Search through cached itineraries
-    for itineraries in ITINERARY_CACHE.values():
-        for itinerary in itineraries:
-            if itinerary.id == itinerary_id:
-                return {
-                    "status": "success",
-                    "itinerary": itinerary.model_dump(mode='json'),
-                }
+    itinerary = ITINERARY_CACHE.get(itinerary_id)
+    if itinerary is None:
+        raise HTTPException(status_code=404, detail="Itinerary not found")
     
-    raise HTTPException(status_code=404, detail="Itinerary not found")
+    return {
+        "status": "success",
+        "itinerary": itinerary.model_dump(mode='json'),
+    }
+
+
+@router.get("/itineraries")
+async def list_itineraries(
+    cursor: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+) -> dict:
+    """List cached itineraries, oldest first, one page at a time.
+    
+    Args:
+        cursor: Cursor from the previous page (0 for the first page)
+        limit: Maximum number of itineraries (default ITINERARY_PAGE_SIZE,
+            at most ITINERARY_PAGE_MAX)
+        
+    Returns:
+        Page of itinerary summaries and the cursor of the next page
+    """
+    page_size = min(limit or ITINERARY_PAGE_SIZE, ITINERARY_PAGE_MAX)
+    itineraries, next_cursor = ITINERARY_CACHE.page(cursor, page_size)
+    
+    return {
+        "status": "success",
+        "count": len(ITINERARY_CACHE),
+        "itineraries": [
+            {
+                "id": it.id,
+                "title": it.title,
+                "score": it.sustainability.total_score,
+                "carbon_kg": it.sustainability.total_carbon_kg,
+                "created_at": id_timestamp(it.id),
+            }
+            for it in itineraries
+        ],
+        "next_cursor": next_cursor,
+    }
 
 
 @router.post("/traveler-profile")
@@ -118,9 +505,10 @@ async def create_traveler_profile(profile: TravelerProfile) -> dict:
         )
         
         profile.profile_vector = vector
+        profile.interest_mask = interest_mask(profile.interests)
         
         # Store in database
-        TRAVELER_DATABASE[profile.id] = profile
+        await _in_store(TRAVELER_DATABASE.add, profile)
         
         return {
             "status": "success",
@@ -132,17 +520,163 @@ async def create_traveler_profile(profile: TravelerProfile) -> dict:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/travelers/bulk")
+async def bulk_ingest_travelers(request: Request) -> dict:
+    """Create or update many traveler profiles from an NDJSON body.
+    
+    Each line is one TravelerProfile JSON object. The body is read as a
+    stream and processed BULK_INGEST_BATCH_SIZE lines at a time: lines are
+    validated and vectorised together, then written to the store with one
+    index update per batch, off the event loop and under the store lock.
+    Profiles whose id is already registered are replaced. Invalid lines
+    are reported and skipped; the rest of the batch is still stored.
+    
+    Args:
+        request: Request with an application/x-ndjson body
+        
+    Returns:
+        Counts of processed and stored profiles plus per-line errors
+    """
+    stored = 0
+    errors: List[dict] = []
+    batch: List[Tuple[int, bytes]] = []
+    line_number = 0
+    
+    async def flush() -> None:
+        nonlocal stored
+        profiles, batch_errors = await run_cpu_bound(_parse_profile_batch, batch)
+        await _in_store(TRAVELER_DATABASE.add_many, profiles)
+        stored += len(profiles)
+        errors.extend(batch_errors)
+        batch.clear()
+    
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                batch.append((line_number, line))
+            if len(batch) >= BULK_INGEST_BATCH_SIZE:
+                await flush()
+    
+    if buffer.strip():
+        batch.append((line_number + 1, buffer))
+        line_number += 1
+    if batch:
+        await flush()
+    
+    print(f"✅ Bulk ingest: {stored} profiles stored, {len(errors)} rejected")
+    
+    return {
+        "status": "success",
+        "lines": line_number,
+        "stored": stored,
+        "failed": len(errors),
+        "errors": errors,
+    }
+
+
+def _parse_profile_batch(lines: List[Tuple[int, bytes]]) -> Tuple[List[TravelerProfile], List[dict]]:
+    """Validate NDJSON profile lines and compute their vectors as one batch.
+    
+    Args:
+        lines: (line number, raw line) pairs
+        
+    Returns:
+        Tuple of (valid profiles with profile vectors, per-line errors)
+    """
+    profiles = []
+    errors = []
+    for line_number, line in lines:
+        try:
+            profiles.append(TravelerProfile.model_validate_json(line))
+        except ValueError as e:
+            errors.append({"line": line_number, "error": str(e)})
+    
+    if profiles:
+        masks = [interest_mask(p.interests) for p in profiles]
+        vectors = create_profile_vectors(
+            sustainability_scores=[p.sustainability_score_min for p in profiles],
+            interest_masks=masks,
+            days=[p.trip_days for p in profiles],
+            budgets=[p.sustainability_score_min * 100 for p in profiles],  # Mock budget
+        )
+        for profile, mask, vector in zip(profiles, masks, vectors.tolist()):
+            profile.profile_vector = vector
+            profile.interest_mask = mask
+    
+    return profiles, errors
+
+
 @router.get("/travelers")
-async def list_travelers() -> dict:
-    """List all registered travelers.
+async def list_travelers(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """List registered travelers, page by page or as an NDJSON stream.
+    
+    Travelers are listed in the order they were registered. In JSON mode
+    one page is returned (``limit`` defaults to TRAVELER_PAGE_SIZE, at most
+    TRAVELER_PAGE_MAX) with a ``next_cursor`` to pass back for the next
+    page. In NDJSON mode every traveler after the cursor (up to ``limit``)
+    is streamed one per line, a page at a time.
     
+    Args:
+        cursor: Cursor from the previous page
+        limit: Maximum number of travelers
+        fields: Comma-separated profile fields to include (default all)
+        format: ``json`` (one page) or ``ndjson`` (stream)
+        
     Returns:
-        List of traveler profiles
+        Page of traveler profiles, or a streaming NDJSON response
     """
+    try:
+        position = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    include = None
+    if fields:
+        include = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = include - set(TravelerProfile.model_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+    
+    if format == "ndjson":
+        async def lines():
+            after, remaining = position, limit
+            while remaining is None or remaining > 0:
+                page_size = TRAVELER_PAGE_MAX if remaining is None else min(remaining, TRAVELER_PAGE_MAX)
+                profiles, after = await _in_store(TRAVELER_DATABASE.page, after, page_size)
+                if profiles:
+                    yield "".join(
+                        json.dumps(p.model_dump(mode='json', include=include)) + "\n"
+                        for p in profiles
+                    )
+                if remaining is not None:
+                    remaining -= len(profiles)
+                if after is None:
+                    break
+                # Let other requests run between pages
+                await asyncio.sleep(0)
+        
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    page_size = min(limit or TRAVELER_PAGE_SIZE, TRAVELER_PAGE_MAX)
+    profiles, next_cursor = await _in_store(TRAVELER_DATABASE.page, position, page_size)
+    
     return {
         "status": "success",
         "count": len(TRAVELER_DATABASE),
-        "travelers": [t.model_dump(mode='json') for t in TRAVELER_DATABASE.values()],
+        "travelers": [p.model_dump(mode='json', include=include) for p in profiles],
+        "next_cursor": None if next_cursor is None else str(next_cursor),
     }
 
 
@@ -151,31 +685,41 @@ async def find_group_matches(
     traveler_id: str,
     destination: Optional[str] = None,
     min_similarity: float = Query(0.7, ge=0.0, le=1.0),
+    same_trip_length: bool = False,
+    ignore_dates: bool = False,
 ) -> dict:
     """Find compatible travelers for group travel.
     
+    Candidates are travelers going to the reference traveler's destination
+    (plus the requested destination, if given) whose trip dates overlap the
+    reference traveler's. Travelers without dates match any dates. Plain
+    same-destination lookups are served from the cached neighbour graph
+    when it holds every match; otherwise the destination partitions are
+    searched.
+    
     Args:
         traveler_id: ID of the reference traveler
-        destination: Optional destination filter
+        destination: Optional extra destination to search
         min_similarity: Minimum similarity threshold
+        same_trip_length: Only match travelers with a similar trip length
+        ignore_dates: Match travelers regardless of their trip dates
         
     Returns:
         List of compatible travelers and group recommendations
     """
-    if traveler_id not in TRAVELER_DATABASE:
+    found = await _in_store(
+        _find_candidates,
+        traveler_id,
+        destination,
+        min_similarity,
+        same_trip_length,
+        ignore_dates,
+    )
+    if found is None:
         raise HTTPException(status_code=404, detail="Traveler not found")
     
-    traveler = TRAVELER_DATABASE[traveler_id]
-    
-    # Build list of other travelers
-    other_travelers = [
-        (tid, t)
-        for tid, t in TRAVELER_DATABASE.items()
-        if tid != traveler_id
-        and (destination is None or t.destination == destination or t.destination == traveler.destination)
-    ]
-    
-    if not other_travelers:
+    traveler, matches, matches_found = found
+    if matches is None:
         return {
             "status": "success",
             "traveler_id": traveler_id,
@@ -183,25 +727,9 @@ async def find_group_matches(
             "message": "No compatible travelers found",
         }
     
-    # Find similar travelers
-    matches = []
-    for other_id, other_profile in other_travelers:
-        if other_profile.profile_vector and traveler.profile_vector:
-            # Calculate similarity
-            similarity = sum(
-                a * b
-                for a, b in zip(traveler.profile_vector, other_profile.profile_vector)
-            ) / (
-                1e-6
-                + (sum(a**2 for a in traveler.profile_vector) ** 0.5)
-                * (sum(b**2 for b in other_profile.profile_vector) ** 0.5)
-            )
-            
-            if similarity >= min_similarity:
-                matches.append((other_id, other_profile, similarity))
-    
-    # Sort by similarity
-    matches.sort(key=lambda x: x[2], reverse=True)
+    # Interests are compared as bitmasks: one AND per candidate
+    traveler_mask = _interest_mask_of(traveler)
+    match_masks = [_interest_mask_of(m[1]) for m in matches]
     
     # Create group recommendations
     group_recommendations = []
@@ -213,56 +741,223 @@ async def find_group_matches(
                 traveler_ids=[traveler_id, best_match[0]],
                 similarity_score=float(best_match[2]),
                 recommended_group_size=2,
-                common_interests=[
-                    i for i in traveler.interests
-                    if i in best_match[1].interests
-                ]
-                if best_match[1].interests else [],
+                common_interests=interests_in_mask(
+                    traveler.interests, traveler_mask & match_masks[0]
+                ),
             )
         )
         
-        # Larger groups if good compatibility
+        # Larger groups if good compatibility: pick the subset of the
+        # candidate pool with the best mean pairwise compatibility
         if len(matches) >= 2 and matches[0][2] > 0.8:
             group_profiles = [
                 traveler.profile_vector
             ] + [
                 m[1].profile_vector
-                for m in matches[:2]
-                if m[1].profile_vector
+                for m in matches
             ]
             
-            group_size = recommend_group_size(group_profiles)
+            group_size = min(
+                recommend_group_size(group_profiles),
+                traveler.max_group_size,
+                MAX_GROUP_SIZE,
+            )
+            pool = [m for m in matches if m[1].max_group_size >= group_size]
+            group_size = min(group_size, len(pool) + 1)
             
-            group_recommendations.append(
-                GroupMatch(
-                    traveler_ids=[traveler_id] + [m[0] for m in matches[:group_size - 1]],
-                    similarity_score=sum(m[2] for m in matches[:group_size - 1]) / (group_size - 1),
-                    recommended_group_size=group_size,
-                    common_interests=list(set(traveler.interests) & set(
-                        i for m in matches[:group_size - 1]
-                        for i in (m[1].interests or [])
-                    )),
+            if group_size > 2:
+                members, compatibility = await run_cpu_bound(
+                    best_group_subset,
+                    [traveler.profile_vector] + [m[1].profile_vector for m in pool],
+                    group_size,
+                    beam_width=GROUP_SEARCH_BEAM_WIDTH,
+                    time_budget=GROUP_SEARCH_TIME_BUDGET,
                 )
-            )
+                group = [pool[i - 1] for i in members if i != 0]
+                
+                group_recommendations.append(
+                    GroupMatch(
+                        traveler_ids=[traveler_id] + [m[0] for m in group],
+                        similarity_score=compatibility,
+                        recommended_group_size=group_size,
+                        common_interests=interests_in_mask(
+                            traveler.interests,
+                            traveler_mask & functools.reduce(
+                                operator.or_, (_interest_mask_of(m[1]) for m in group), 0
+                            ),
+                        ),
+                    )
+                )
+    
+    interest_similarities = interest_jaccard_many(traveler_mask, match_masks[:TOP_MATCHES])
     
     return {
         "status": "success",
         "traveler_id": traveler_id,
-        "matches_found": len(matches),
+        "matches_found": matches_found,
         "top_matches": [
             {
                 "traveler_id": m[0],
                 "name": m[1].name,
                 "destination": m[1].destination,
                 "similarity_score": float(m[2]),
-                "common_interests": [str(i.value) if hasattr(i, 'value') else str(i) for i in traveler.interests if m[1].interests and i in m[1].interests],
+                "interest_similarity": float(interest_similarities[index]),
+                "common_interests": [
+                    str(i.value) if hasattr(i, 'value') else str(i)
+                    for i in interests_in_mask(traveler.interests, traveler_mask & mask)
+                ],
             }
-            for m in matches[:5]
+            for index, (m, mask) in enumerate(zip(matches[:TOP_MATCHES], match_masks))
         ],
         "group_recommendations": [gr.model_dump(mode='json') for gr in group_recommendations],
     }
 
 
+def _find_candidates(
+    traveler_id: str,
+    destination: Optional[str],
+    min_similarity: float,
+    same_trip_length: bool,
+    ignore_dates: bool,
+) -> Optional[Tuple[TravelerProfile, Optional[List[Tuple[str, TravelerProfile, float]]], int]]:
+    """Look up a traveler and their best matches in the traveler store.
+    
+    Args:
+        traveler_id: ID of the reference traveler
+        destination: Optional extra destination to search
+        min_similarity: Minimum similarity threshold
+        same_trip_length: Only match travelers with a similar trip length
+        ignore_dates: Match travelers regardless of their trip dates
+        
+    Returns:
+        None if the traveler is unknown, else a tuple of (traveler, top
+        matches as (id, profile, similarity) or None when nobody else is
+        going, total number of matches)
+    """
+    traveler = TRAVELER_DATABASE.get(traveler_id)
+    if traveler is None:
+        return None
+    
+    # Only the destination partitions being searched are touched
+    destinations = {traveler.destination} if destination is None else {destination, traveler.destination}
+    trip_days = traveler.trip_days if same_trip_length else None
+    date_range = None
+    if traveler.start_date and not ignore_dates:
+        date_range = (traveler.start_date, traveler.end_date)
+    
+    other_travelers = TRAVELER_DATABASE.count(destinations, trip_days) - bool(traveler.profile_vector)
+    if other_travelers <= 0:
+        return traveler, None, 0
+    
+    # Find similar travelers: O(k) from the neighbour graph, else one
+    # matrix-vector product per partition
+    if not traveler.profile_vector:
+        return traveler, [], 0
+    cached = None
+    if destination is None and not same_trip_length:
+        cached = TRAVELER_DATABASE.cached_matches(traveler_id, min_similarity, date_range)
+    if cached is not None:
+        top_matches, matches_found = cached[0][:GROUP_SEARCH_CANDIDATES], cached[1]
+    else:
+        top_matches, matches_found = TRAVELER_DATABASE.search(
+            traveler.profile_vector,
+            destinations,
+            min_similarity=min_similarity,
+            top_k=GROUP_SEARCH_CANDIDATES,
+            exclude=traveler_id,
+            trip_days=trip_days,
+            date_range=date_range,
+        )
+    matches = [
+        (other_id, TRAVELER_DATABASE[other_id], similarity)
+        for other_id, similarity in top_matches
+    ]
+    return traveler, matches, matches_found
+
+
+@router.post("/form-groups")
+async def form_travel_groups(
+    destination: str,
+    min_similarity: float = Query(0.7, ge=0.0, le=1.0),
+) -> dict:
+    """Split every traveler going to a destination into compatible groups.
+    
+    Groups respect each traveler's max_group_size as well as MIN_GROUP_SIZE
+    and MAX_GROUP_SIZE, and every member's average similarity to the rest
+    of its group is at least min_similarity. Travelers who fit no group
+    are returned as unmatched.
+    
+    Args:
+        destination: Destination whose travelers are grouped
+        min_similarity: Minimum average similarity of a member to its group
+        
+    Returns:
+        Group recommendations and unmatched traveler ids
+    """
+    # Snapshot under the store lock so the solver never sees a half-applied write
+    traveler_ids, vectors, max_sizes, masks, interests = await _in_store(
+        _group_snapshot, destination
+    )
+    if not traveler_ids:
+        return {
+            "status": "success",
+            "destination": destination,
+            "groups": [],
+            "message": "No travelers found for this destination",
+        }
+    
+    groups, unmatched = await run_cpu_bound(
+        form_groups,
+        traveler_ids,
+        vectors,
+        max_sizes,
+        min_similarity=min_similarity,
+    )
+    
+    return {
+        "status": "success",
+        "destination": destination,
+        "travelers": len(traveler_ids),
+        "groups_formed": len(groups),
+        "groups": [
+            GroupMatch(
+                traveler_ids=members,
+                similarity_score=similarity,
+                recommended_group_size=len(members),
+                common_interests=interests_in_mask(
+                    interests[members[0]],
+                    functools.reduce(operator.and_, (masks[i] for i in members)),
+                ),
+            ).model_dump(mode='json')
+            for members, similarity in groups
+        ],
+        "unmatched": unmatched,
+    }
+
+
+def _group_snapshot(destination: str) -> tuple:
+    """Copy what group formation needs about a destination's travelers.
+    
+    Args:
+        destination: Destination whose travelers are grouped
+        
+    Returns:
+        Tuple of (traveler ids, vectors, max group sizes, interest masks by
+        id, interests by id)
+    """
+    traveler_ids, vectors = TRAVELER_DATABASE.snapshot(destination)
+    if not traveler_ids:
+        return [], vectors, None, {}, {}
+    # Read the columns directly instead of building every profile
+    return (
+        traveler_ids,
+        vectors,
+        TRAVELER_DATABASE.max_group_sizes(traveler_ids),
+        {i: TRAVELER_DATABASE.interest_mask(i) for i in traveler_ids},
+        {i: TRAVELER_DATABASE.interests(i) for i in traveler_ids},
+    )
+
+
 @router.post("/score-itinerary")
 async def score_itinerary(itinerary_id: int) -> dict:
     """Score an existing itinerary and return detailed breakdown.
@@ -276,17 +971,8 @@ async def score_itinerary(itinerary_id: int) -> dict:
     Returns:
         Sustainability score and detailed breakdown with explanations
     """
-    # Find the itinerary in cache
-    found_itinerary = None
-    for cached_itineraries in ITINERARY_CACHE.values():
-        for itinerary in cached_itineraries:
-            if itinerary.id == itinerary_id:
-                found_itinerary = itinerary
-                break
-        if found_itinerary:
-            break
-    
-    if not found_itinerary:
+    found_itinerary = ITINERARY_CACHE.get(itinerary_id)
+    if found_itinerary is None:
         raise HTTPException(status_code=404, detail="Itinerary not found")
     
     sustainability = found_itinerary.sustainability
@@ -347,14 +1033,7 @@ async def compare_itineraries(itinerary_ids: List[int]) -> dict:
     Returns:
         Comparison of itineraries with sustainability scores
     """
-    itineraries = []
-    
-    for itinerary_id in itinerary_ids:
-        for cached_itineraries in ITINERARY_CACHE.values():
-            for itinerary in cached_itineraries:
-                if itinerary.id == itinerary_id:
-                    itineraries.append(itinerary)
-                    break
+    itineraries = ITINERARY_CACHE.get_many(itinerary_ids)
     
     if not itineraries:
         raise HTTPException(status_code=404, detail="No matching itineraries found")
@@ -515,8 +1194,9 @@ async def create_mock_travelers() -> dict:
             budget=traveler.sustainability_score_min * 100,
         )
         traveler.profile_vector = vector
-        TRAVELER_DATABASE[traveler.id] = traveler
+        traveler.interest_mask = interest_mask(traveler.interests)
         created_count += 1
+    await _in_store(TRAVELER_DATABASE.add_many, mock_travelers)
     
     return {
         "status": "success",
@@ -538,5 +1218,10 @@ async def health_check() -> dict:
         "service": "Smart Eco Tour Backend API",
         "version": "1.0.0",
         "cached_itineraries": len(ITINERARY_CACHE),
+        "itinerary_cache": ITINERARY_CACHE.stats(),
         "registered_travelers": len(TRAVELER_DATABASE),
+        "traveler_store": TRAVELER_DATABASE.stats(),
+        "llm_cache": LLM_CACHE.stats() if LLM_CACHE is not None else None,
+        "generation_flights": GENERATION_FLIGHTS.stats(),
+        "jobs": JOB_QUEUE.stats(),
     }
@@ -1,5 +1,6 @@
 """Configuration file for Smart Eco Tour Backend."""
 import os
+import tempfile
 from pathlib import Path
 from typing import Optional
 
@@ -77,10 +78,40 @@ DEFAULT_SIMILARITY_THRESHOLD = 0.7
 MAX_GROUP_SIZE = 8
 MIN_GROUP_SIZE = 2
 
+# Best-subset search for the larger group recommended by find-group
+GROUP_SEARCH_CANDIDATES = 30  # matches considered for the group
+GROUP_SEARCH_BEAM_WIDTH = 8
+GROUP_SEARCH_TIME_BUDGET = float(os.getenv("GROUP_SEARCH_TIME_BUDGET", "0.05"))  # seconds
+
+# Approximate nearest-neighbour (IVF) index for large traveler partitions
+TRAVELER_ANN_ENABLED = os.getenv("TRAVELER_ANN_ENABLED", "false").lower() == "true"
+# Smaller partitions are scanned exactly; benchmark_similarity.py shows the
+# exact scan winning below about 5000 travelers
+ANN_MIN_INDEX_SIZE = int(os.getenv("ANN_MIN_INDEX_SIZE", "10000"))
+ANN_NUM_LISTS = int(os.getenv("ANN_NUM_LISTS", "0"))  # 0 = sqrt(partition size)
+ANN_NUM_PROBES = int(os.getenv("ANN_NUM_PROBES", "4"))
+
+# Cached top-k neighbours per traveler, maintained on write (0 disables)
+TRAVELER_NEIGHBOURS_K = int(os.getenv("TRAVELER_NEIGHBOURS_K", "20"))
+
+# Storage type of traveler profile vectors: float32 or int8 (quantised)
+TRAVELER_VECTOR_DTYPE = os.getenv("TRAVELER_VECTOR_DTYPE", "float32")
+
 # Cache Settings
-ITINERARY_CACHE_MAX_SIZE = 1000
+ITINERARY_CACHE_MAX_SIZE = int(os.getenv("ITINERARY_CACHE_MAX_SIZE", "1000"))  # itineraries
+ITINERARY_CACHE_TTL = int(os.getenv("ITINERARY_CACHE_TTL", "86400"))  # seconds
+ITINERARY_CACHE_MAX_BYTES = int(os.getenv("ITINERARY_CACHE_MAX_BYTES", "67108864"))  # 0 = no limit
 TRAVELER_CACHE_MAX_SIZE = 5000
 
+# LLM response cache (set LLM_CACHE_PATH to an empty string for memory only)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))  # seconds
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    str(Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "smart-eco-tour" / "llm_cache.db"),
+)
+
 # Database (for future use)
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
@@ -101,6 +132,12 @@ SUPPORTED_DESTINATIONS = [
     "Bali",
 ]
 
+# Itinerary planning: optimise each day's activities (false = random sampling)
+ITINERARY_OPTIMIZER_ENABLED = os.getenv("ITINERARY_OPTIMIZER_ENABLED", "true").lower() == "true"
+ITINERARY_DAY_HOURS = 10  # 9 AM to 7 PM, including transit between activities
+ITINERARY_MIN_DAILY_ACTIVITIES = 3  # the score averages activities, so days are not left near-empty
+ITINERARY_MAX_DAILY_ACTIVITIES = 4
+
 # Default values
 DEFAULT_TRIP_DURATION = 5  # days
 DEFAULT_BUDGET = 2000  # USD
@@ -114,6 +151,36 @@ RATE_LIMIT_PERIOD = 3600  # seconds (1 hour)
 REQUEST_TIMEOUT = 30  # seconds
 LLM_REQUEST_TIMEOUT = 60  # seconds
 
+# LLM HTTP connection pool
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))  # seconds
+
+# Concurrency
+GENERATION_MAX_WORKERS = int(os.getenv("GENERATION_MAX_WORKERS", "4"))  # CPU-bound executor threads
+
+# Itinerary id allocation: each server process locks one of 32 worker id
+# slot files in this directory, so processes sharing it never collide
+WORKER_ID_DIR = Path(os.getenv("WORKER_ID_DIR", Path(tempfile.gettempdir()) / "eco-tour-worker-ids"))
+
+# Background generation jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # jobs processed concurrently
+JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+JOB_TTL = int(os.getenv("JOB_TTL", "3600"))  # seconds finished jobs are kept
+JOB_MAX_WAIT = 30  # seconds a status request may long-poll
+
+# Batch generation
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))  # trips generated at once
+
+# Bulk traveler ingest
+BULK_INGEST_BATCH_SIZE = int(os.getenv("BULK_INGEST_BATCH_SIZE", "1000"))  # lines per batch
+
+# Traveler and itinerary listing pagination
+TRAVELER_PAGE_SIZE = 100
+TRAVELER_PAGE_MAX = 1000
+ITINERARY_PAGE_SIZE = 50
+ITINERARY_PAGE_MAX = 500
+
 # Logging Configuration
 LOGGING_CONFIG = {
     "version": 1,
@@ -5,6 +5,9 @@ from fastapi.responses import JSONResponse
 import logging
 from app.api import routes
 from app.models.schemas import TripInput, Itinerary
+from app.utils.concurrency import shutdown_executor
+from app.utils.ids import ITINERARY_IDS
+from app.services.llm import LLM_CACHE, close_groq_client
 
 # Configure logging
 logging.basicConfig(
@@ -38,6 +41,9 @@ async def startup_event():
     """Initialize application on startup."""
     logger.info("🚀 Smart Eco Tour Backend starting up...")
     logger.info("✅ API endpoints registered")
+    logger.info(f"🆔 Itinerary worker id {ITINERARY_IDS.claim()}")
+    routes.JOB_QUEUE.start()
+    logger.info(f"⚙️  Job queue started with {routes.JOB_QUEUE.workers} workers")
     logger.info("📡 CORS enabled for frontend integration")
 
 
@@ -45,6 +51,13 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("🛑 Smart Eco Tour Backend shutting down...")
+    await routes.JOB_QUEUE.stop()
+    shutdown_executor()
+    logger.info("✅ Worker pool stopped")
+    await close_groq_client()
+    logger.info("✅ LLM connection pool closed")
+    if LLM_CACHE is not None:
+        LLM_CACHE.close()
 
 
 @app.get("/")
@@ -57,9 +70,16 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "generate_itinerary": "POST /api/generate-itinerary",
+            "stream_itinerary": "POST /api/generate-itinerary/stream",
+            "batch_itineraries": "POST /api/generate-itinerary/batch",
+            "submit_itinerary_job": "POST /api/jobs/generate-itinerary",
+            "job_status": "GET /api/jobs/{job_id}",
             "get_itinerary": "GET /api/itinerary/{id}",
+            "list_itineraries": "GET /api/itineraries",
             "create_profile": "POST /api/traveler-profile",
+            "bulk_create_profiles": "POST /api/travelers/bulk",
             "find_groups": "POST /api/find-group",
+            "form_groups": "POST /api/form-groups",
             "compare_itineraries": "POST /api/compare-itineraries",
             "sustainability_tips": "GET /api/sustainability-tips",
             "health": "GET /api/health",
@@ -1,6 +1,7 @@
 """Pydantic models for request/response validation."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Dict, Optional
+from datetime import date, timedelta
 from enum import Enum
 
 
@@ -22,6 +23,14 @@ class ActivityType(str, Enum):
     FOOD = "food"
 
 
+class JobStatus(str, Enum):
+    """Lifecycle states of a background job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 class DayActivity(BaseModel):
     """Single activity in an itinerary."""
     time: str
@@ -98,6 +107,20 @@ class TravelerProfile(BaseModel):
     max_group_size: int = 5
     transport_preference: TransportMode
     profile_vector: Optional[List[float]] = None
+    interest_mask: Optional[int] = None  # Bitmask over INTEREST_CATEGORIES
+    start_date: Optional[date] = None  # No dates means flexible
+    end_date: Optional[date] = None
+    
+    @model_validator(mode="after")
+    def fill_trip_dates(self) -> "TravelerProfile":
+        """Derive a missing trip date from trip_days and check the range."""
+        if self.start_date and not self.end_date:
+            self.end_date = self.start_date + timedelta(days=max(self.trip_days - 1, 0))
+        elif self.end_date and not self.start_date:
+            self.start_date = self.end_date - timedelta(days=max(self.trip_days - 1, 0))
+        if self.start_date and self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        return self
 
 
 class GroupMatch(BaseModel):
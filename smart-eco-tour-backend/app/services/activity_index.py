@@ -0,0 +1,217 @@
+"""Activity catalogues compiled for fast weighted selection."""
+import random
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from app.models.schemas import ActivityType, TransportMode
+from app.utils.sampling import AliasSampler
+
+# How much more likely an activity matching the traveler's interests is drawn
+INTEREST_WEIGHT = 3.0
+
+# Rejected (already chosen) alias draws allowed per call before falling back
+# to an exact draw over the remaining activities
+MAX_REJECTIONS = 8
+
+# Relative sustainability of each activity type (1.0 = most sustainable)
+ACTIVITY_ECO_FACTORS = {
+    ActivityType.NATURE: 1.0,
+    ActivityType.LOCAL: 1.0,
+    ActivityType.CULTURE: 0.8,
+    ActivityType.FOOD: 0.8,
+    ActivityType.ADVENTURE: 0.5,
+}
+
+
+class DestinationCatalogue:
+    """One destination's activities stored as flat, index-aligned tuples.
+
+    Activities of the same type are contiguous, so an activity of a given
+    type is picked with one random index into its range. Weighted samplers
+    are built once per (interests, sustainability preference) combination
+    and cached.
+
+    Every activity is also given a weight in the same cache, so distinct
+    activities can be drawn without replacement in bounded time.
+    """
+
+    def __init__(self, activities_by_type: Dict[ActivityType, List[Dict]]):
+        """Compile a destination's activity lists.
+
+        Args:
+            activities_by_type: Activity dicts (name, duration, location) by type
+        """
+        names, durations, locations, types = [], [], [], []
+        self._ranges: Dict[ActivityType, range] = {}
+        for activity_type, activities in activities_by_type.items():
+            start = len(names)
+            for activity in activities:
+                names.append(activity["name"])
+                durations.append(activity["duration"])
+                locations.append(activity["location"])
+                types.append(activity_type)
+            if len(names) > start:
+                self._ranges[activity_type] = range(start, len(names))
+
+        self.names = tuple(names)
+        self.durations = tuple(durations)
+        self.locations = tuple(locations)
+        self.types = tuple(types)
+        # Bound to the instance so each catalogue has its own cache
+        self._samplers = lru_cache(maxsize=64)(self._build_sampler)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def choose_of_type(self, activity_type: ActivityType, rng: random.Random = random) -> Optional[int]:
+        """Pick a random activity of one type.
+
+        Args:
+            activity_type: Activity type
+            rng: Random number source
+
+        Returns:
+            Activity index, or None if the destination has none of that type
+        """
+        indices = self._ranges.get(activity_type)
+        if indices is None:
+            return None
+        return indices[int(rng.random() * len(indices))]
+
+    def sample_distinct(
+        self,
+        count: int,
+        interests: FrozenSet[ActivityType],
+        preference: float,
+        exclude: Set[int],
+        rng: random.Random = random,
+    ) -> List[int]:
+        """Draw weighted activities without replacement.
+
+        Draws come from the alias sampler while they keep hitting new
+        activities. After MAX_REJECTIONS repeats, the rest are drawn
+        exactly over the remaining activities (weighted random keys), so
+        the work is bounded by O(count + MAX_REJECTIONS + catalogue size)
+        however skewed the weights or small the catalogue.
+
+        Args:
+            count: Number of activities wanted
+            interests: Traveler interests
+            preference: Sustainability preference (0-1)
+            exclude: Indices already chosen (updated in place)
+            rng: Random number source
+
+        Returns:
+            Up to count new activity indices (fewer if the catalogue runs out)
+        """
+        preference = round(min(1.0, max(0.0, preference)), 1)
+        sampler, weights = self._samplers(frozenset(interests), preference)
+        count = min(count, len(self.names) - len(exclude))
+
+        drawn: List[int] = []
+        rejections = 0
+        while len(drawn) < count and rejections < MAX_REJECTIONS:
+            index = sampler.sample(rng)
+            if index in exclude:
+                rejections += 1
+                continue
+            exclude.add(index)
+            drawn.append(index)
+
+        if len(drawn) < count:
+            # Efraimidis-Spirakis: the largest u ** (1 / w) keys form a
+            # weighted sample without replacement
+            remaining = [i for i in range(len(self.names)) if i not in exclude]
+            remaining.sort(key=lambda i: rng.random() ** (1.0 / weights[i]), reverse=True)
+            for index in remaining[:count - len(drawn)]:
+                exclude.add(index)
+                drawn.append(index)
+        return drawn
+
+    def activity(self, index: int, transport: TransportMode, distance: float) -> Dict:
+        """Build the activity dict used by itinerary generation and scoring.
+
+        Args:
+            index: Activity index
+            transport: Transport mode used to reach the activity
+            distance: Distance travelled to the activity in km
+
+        Returns:
+            Activity dict
+        """
+        return {
+            "type": self.types[index],
+            "name": self.names[index],
+            "duration": self.durations[index],
+            "location": self.locations[index],
+            "transport": transport,
+            "distance": distance,
+        }
+
+    def _build_sampler(
+        self,
+        interests: FrozenSet[ActivityType],
+        preference: float,
+    ) -> Tuple[AliasSampler, List[float]]:
+        """Build a sampler weighted by interests and sustainability preference.
+
+        Args:
+            interests: Traveler interests
+            preference: Sustainability preference (0-1, rounded by the caller)
+
+        Returns:
+            Tuple of (sampler over activity indices, activity weights)
+        """
+        weights = []
+        for activity_type in self.types:
+            weight = INTEREST_WEIGHT if activity_type in interests else 1.0
+            # Blend towards eco-friendly types as the preference grows
+            eco = ACTIVITY_ECO_FACTORS.get(activity_type, 0.75)
+            weights.append(weight * (1.0 - preference + preference * eco))
+        return AliasSampler(weights), weights
+
+
+class ActivityIndex:
+    """Compiled activity catalogues for every destination."""
+
+    def __init__(
+        self,
+        database: Dict[str, Dict[ActivityType, List[Dict]]],
+        fallback: Optional[Dict[ActivityType, List[Dict]]] = None,
+    ):
+        """Compile every destination's catalogue once.
+
+        Args:
+            database: Activity lists by destination and type
+            fallback: Generic activities for destinations without a catalogue
+        """
+        self._catalogues = {
+            destination: DestinationCatalogue(activities_by_type)
+            for destination, activities_by_type in database.items()
+        }
+        self._fallback = DestinationCatalogue(fallback or {})
+
+    def get(self, destination: str) -> Optional[DestinationCatalogue]:
+        """Get a destination's catalogue, or the generic one if it has none.
+
+        Args:
+            destination: Destination name
+
+        Returns:
+            Compiled catalogue, or None if there are no activities at all
+        """
+        catalogue = self._catalogues.get(destination)
+        if not catalogue:
+            catalogue = self._fallback
+        return catalogue if catalogue else None
+
+    def has_catalogue(self, destination: str) -> bool:
+        """Whether a destination has its own (non-generic) activities.
+
+        Args:
+            destination: Destination name
+
+        Returns:
+            True if the destination has a non-empty catalogue
+        """
+        return bool(self._catalogues.get(destination))
@@ -0,0 +1,244 @@
+"""Batch group formation over all travelers going to a destination."""
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from app.config import MAX_GROUP_SIZE, MIN_GROUP_SIZE
+
+# Travelers per block solved exactly on a dense similarity matrix
+BLOCK_SIZE = 512
+
+
+def form_groups(
+    ids: Sequence[str],
+    vectors: np.ndarray,
+    max_sizes: Sequence[int],
+    min_similarity: float = 0.0,
+    max_group_size: int = MAX_GROUP_SIZE,
+    min_group_size: int = MIN_GROUP_SIZE,
+    block_size: int = BLOCK_SIZE,
+    refine_passes: int = 2,
+) -> Tuple[List[Tuple[List[str], float]], List[str]]:
+    """Partition travelers into groups of mutually similar travelers.
+
+    Travelers are first split into blocks of similar profiles by recursive
+    bisection along each block's principal direction. Within a block,
+    groups are grown greedily around the most central travelers and then
+    refined by local search that moves travelers to the group they are
+    most similar to on average. A final pass drops members below
+    min_similarity, so every member of a returned group has an average
+    similarity of at least min_similarity to the rest of its group.
+
+    Args:
+        ids: Traveler ids
+        vectors: Profile vectors (one row per id)
+        max_sizes: Each traveler's own maximum group size
+        min_similarity: Minimum average similarity of a member to its group
+        max_group_size: Upper bound on any group size
+        min_group_size: Smallest group worth forming
+        block_size: Maximum number of travelers solved together
+        refine_passes: Number of local-search passes per block
+
+    Returns:
+        Tuple of (groups as (traveler_ids, average pairwise similarity)
+        sorted by similarity descending, ids of unmatched travelers)
+    """
+    n = len(ids)
+    if n == 0:
+        return [], []
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.where(norms > 0, norms, 1.0)
+    caps = np.minimum(np.asarray(max_sizes, dtype=np.int64), max_group_size)
+
+    groups: List[Tuple[List[str], float]] = []
+    unmatched: List[str] = []
+    for block in _bisect(matrix, block_size):
+        block_groups, block_unmatched = _solve_block(
+            matrix[block],
+            caps[block],
+            min_similarity,
+            min_group_size,
+            refine_passes,
+        )
+        for members, similarity in block_groups:
+            groups.append(([ids[block[i]] for i in members], similarity))
+        unmatched.extend(ids[block[i]] for i in block_unmatched)
+
+    groups.sort(key=lambda group: group[1], reverse=True)
+    return groups, unmatched
+
+
+def _bisect(matrix: np.ndarray, block_size: int) -> List[np.ndarray]:
+    """Split row indices into balanced blocks of similar rows."""
+    rng = np.random.default_rng(0)
+    pending = [np.arange(len(matrix))]
+    blocks = []
+    while pending:
+        rows = pending.pop()
+        if len(rows) <= block_size:
+            blocks.append(rows)
+            continue
+
+        # A few power iterations find the direction of largest spread
+        centred = matrix[rows] - matrix[rows].mean(axis=0)
+        direction = rng.standard_normal(matrix.shape[1]).astype(np.float32)
+        for _ in range(4):
+            direction = centred.T @ (centred @ direction)
+            norm = np.linalg.norm(direction)
+            if norm == 0:
+                break
+            direction /= norm
+
+        order = np.argsort(centred @ direction, kind="stable")
+        half = len(rows) // 2
+        pending.append(rows[order[:half]])
+        pending.append(rows[order[half:]])
+    return blocks
+
+
+def _solve_block(
+    matrix: np.ndarray,
+    caps: np.ndarray,
+    min_similarity: float,
+    min_group_size: int,
+    refine_passes: int,
+) -> Tuple[List[Tuple[List[int], float]], List[int]]:
+    """Group the rows of one block (row indices are local to the block)."""
+    n = len(matrix)
+    gram = matrix @ matrix.T
+    assignment = np.full(n, -1, dtype=np.int64)
+    members: List[List[int]] = []
+
+    # Greedy: grow a group around the most central unassigned traveler,
+    # adding whoever is most similar to the group on average
+    for seed in np.argsort(-gram.sum(axis=1), kind="stable"):
+        if assignment[seed] != -1 or caps[seed] < min_group_size:
+            continue
+        group = [seed]
+        cap = caps[seed]
+        sums = gram[seed].copy()
+        available = (assignment == -1) & (caps >= min_group_size)
+        available[seed] = False
+
+        while len(group) < cap:
+            scores = np.where(available & (caps > len(group)), sums / len(group), -np.inf)
+            best = int(np.argmax(scores))
+            if scores[best] < min_similarity:
+                break
+            group.append(best)
+            available[best] = False
+            sums += gram[best]
+            cap = min(cap, caps[best])
+
+        if len(group) >= min_group_size:
+            assignment[group] = len(members)
+            members.append(group)
+
+    if members:
+        _refine(gram, caps, assignment, members, min_similarity, min_group_size, refine_passes)
+
+    groups = []
+    for group in members:
+        group = _enforce_min_similarity(gram, group, min_similarity)
+        if len(group) >= min_group_size:
+            groups.append((group, _average_similarity(gram, group)))
+    grouped = {i for group, _ in groups for i in group}
+    unmatched = [i for i in range(n) if i not in grouped]
+    return groups, unmatched
+
+
+def _refine(
+    gram: np.ndarray,
+    caps: np.ndarray,
+    assignment: np.ndarray,
+    members: List[List[int]],
+    min_similarity: float,
+    min_group_size: int,
+    passes: int,
+) -> None:
+    """Local search: move travelers to the group they fit best, in place."""
+    n_groups = len(members)
+    one_hot = np.zeros((len(gram), n_groups), dtype=np.float32)
+    grouped = np.flatnonzero(assignment != -1)
+    one_hot[grouped, assignment[grouped]] = 1.0
+    # sums[i, g] = total similarity of traveler i to the members of group g
+    sums = gram @ one_hot
+    sizes = np.array([len(group) for group in members], dtype=np.int64)
+    group_caps = np.array([caps[group].min() for group in members], dtype=np.int64)
+
+    for _ in range(passes):
+        moved = 0
+        for i in range(len(gram)):
+            source = assignment[i]
+            if caps[i] < min_group_size:
+                continue
+
+            # Average similarity to each group if i were to join it
+            fits = (sizes < np.minimum(group_caps, caps[i])) & (sizes > 0)
+            scores = np.where(fits, sums[i] / np.maximum(sizes, 1), -np.inf)
+
+            if source == -1:
+                current = min_similarity
+            else:
+                if sizes[source] <= min_group_size:
+                    continue
+                scores[source] = -np.inf
+                current = (sums[i, source] - gram[i, i]) / (sizes[source] - 1)
+
+            target = int(np.argmax(scores))
+            if scores[target] <= current + 1e-6 or scores[target] < min_similarity:
+                continue
+            
+            # Members staying in either group must keep their own average
+            joined = members[target]
+            if np.any(
+                (sums[joined, target] + gram[joined, i] - gram[joined, joined]) / sizes[target]
+                < min_similarity
+            ):
+                continue
+            if source != -1 and sizes[source] > 2:
+                left = [j for j in members[source] if j != i]
+                if np.any(
+                    (sums[left, source] - gram[left, i] - gram[left, left]) / (sizes[source] - 2)
+                    < min_similarity
+                ):
+                    continue
+
+            if source != -1:
+                members[source].remove(i)
+                sizes[source] -= 1
+                sums[:, source] -= gram[:, i]
+                group_caps[source] = caps[members[source]].min()
+            members[target].append(i)
+            sizes[target] += 1
+            sums[:, target] += gram[:, i]
+            group_caps[target] = min(group_caps[target], caps[i])
+            assignment[i] = target
+            moved += 1
+
+        if not moved:
+            break
+
+
+def _enforce_min_similarity(gram: np.ndarray, group: List[int], min_similarity: float) -> List[int]:
+    """Drop the least similar member until every member meets min_similarity."""
+    group = list(group)
+    while len(group) > 1:
+        block = gram[np.ix_(group, group)]
+        averages = (block.sum(axis=1) - np.diag(block)) / (len(group) - 1)
+        worst = int(np.argmin(averages))
+        if averages[worst] >= min_similarity:
+            break
+        del group[worst]
+    return group
+
+
+def _average_similarity(gram: np.ndarray, group: List[int]) -> float:
+    """Average pairwise similarity of a group."""
+    size = len(group)
+    if size < 2:
+        return 1.0
+    block = gram[np.ix_(group, group)]
+    return float((block.sum() - np.trace(block)) / (size * (size - 1)))
@@ -0,0 +1,221 @@
+"""Bounded in-memory store of generated itineraries."""
+import bisect
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.models.schemas import Itinerary
+from app.utils.ids import first_id_at
+
+
+class _TripEntry(NamedTuple):
+    """Itineraries generated for one trip."""
+
+    itineraries: List[Itinerary]
+    size_bytes: int
+
+
+class ItineraryStore:
+    """Itineraries indexed by id and by trip, with LRU and TTL eviction.
+
+    Itineraries are stored per trip key (the options generated together for
+    one trip) and every itinerary id points at its trip, so lookups by id
+    and by trip are O(1). Whole trips are evicted, least recently used
+    first, once more than ``max_size`` itineraries or ``max_bytes`` of
+    serialized itinerary data are held.
+
+    Itinerary ids are time-ordered (see app.utils.ids), so the store also
+    keeps them sorted: expiring trips ``ttl_seconds`` after their
+    itineraries were created and paging in creation order are both range
+    operations on that list.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl_seconds: float = 86400,
+        max_bytes: int = 0,
+    ):
+        """Create an empty store.
+
+        Args:
+            max_size: Maximum number of itineraries held
+            ttl_seconds: Time-to-live for stored trips
+            max_bytes: Maximum serialized size of held itineraries (0 for no limit)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # Trips in least- to most-recently used order
+        self._trips: "OrderedDict[str, _TripEntry]" = OrderedDict()
+        self._by_id: Dict[int, Tuple[str, Itinerary]] = {}
+        # Indexed ids in ascending (creation) order
+        self._ids: List[int] = []
+        self._size = 0
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, trip_key: str, itineraries: List[Itinerary], size_bytes: int) -> None:
+        """Store the itineraries generated for a trip, replacing older ones.
+
+        Args:
+            trip_key: Key identifying the trip
+            itineraries: Itineraries generated for the trip
+            size_bytes: Serialized size of the itineraries in bytes, measured
+                by the caller where it encodes them (the store never
+                serializes)
+        """
+        self._discard(trip_key)
+
+        self._trips[trip_key] = _TripEntry(list(itineraries), size_bytes)
+        for itinerary in itineraries:
+            if itinerary.id not in self._by_id:
+                # New ids are the largest, so this is usually an append
+                bisect.insort(self._ids, itinerary.id)
+            self._by_id[itinerary.id] = (trip_key, itinerary)
+        self._size += len(itineraries)
+        self._bytes += size_bytes
+
+        self._purge_expired(time.time())
+        self._evict(keep=trip_key)
+
+    def get(self, itinerary_id: int) -> Optional[Itinerary]:
+        """Look up an itinerary by id.
+
+        Args:
+            itinerary_id: Itinerary id
+
+        Returns:
+            The itinerary, or None if unknown, evicted or expired
+        """
+        self._purge_expired(time.time())
+        entry = self._by_id.get(itinerary_id)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        trip_key, itinerary = entry
+        self._trips.move_to_end(trip_key)
+        self._stats["hits"] += 1
+        return itinerary
+
+    def get_many(self, itinerary_ids: Iterable[int]) -> List[Itinerary]:
+        """Look up several itineraries, skipping unknown ids.
+
+        Args:
+            itinerary_ids: Itinerary ids
+
+        Returns:
+            Found itineraries in the order requested
+        """
+        found = []
+        for itinerary_id in itinerary_ids:
+            itinerary = self.get(itinerary_id)
+            if itinerary is not None:
+                found.append(itinerary)
+        return found
+
+    def for_trip(self, trip_key: str) -> Optional[List[Itinerary]]:
+        """Get the itineraries stored for a trip.
+
+        Args:
+            trip_key: Key identifying the trip
+
+        Returns:
+            The trip's itineraries, or None if not stored
+        """
+        self._purge_expired(time.time())
+        entry = self._trips.get(trip_key)
+        if entry is None:
+            return None
+        self._trips.move_to_end(trip_key)
+        return list(entry.itineraries)
+
+    def page(
+        self,
+        cursor: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Itinerary], Optional[int]]:
+        """Get itineraries in creation order, starting after a cursor.
+
+        Args:
+            cursor: Cursor returned by the previous page (0 for the start)
+            limit: Maximum number of itineraries (None for all)
+
+        Returns:
+            Tuple of (itineraries, cursor for the next page or None if this
+            was the last page)
+        """
+        self._purge_expired(time.time())
+        start = bisect.bisect_right(self._ids, cursor)
+        end = len(self._ids) if limit is None else min(start + limit, len(self._ids))
+        ids = self._ids[start:end]
+        next_cursor = ids[-1] if end < len(self._ids) else None
+        return [self._by_id[itinerary_id][1] for itinerary_id in ids], next_cursor
+
+    def evict_before(self, timestamp: float) -> int:
+        """Drop every trip holding an itinerary created before a time.
+
+        Args:
+            timestamp: Unix timestamp in seconds
+
+        Returns:
+            Number of trips dropped
+        """
+        cutoff = first_id_at(timestamp)
+        dropped = 0
+        while self._ids and self._ids[0] < cutoff:
+            self._discard(self._by_id[self._ids[0]][0])
+            dropped += 1
+        return dropped
+
+    def stats(self) -> Dict[str, int]:
+        """Get store size, memory use and counters.
+
+        Returns:
+            Dict of store statistics
+        """
+        return {
+            **self._stats,
+            "trips": len(self._trips),
+            "itineraries": self._size,
+            "bytes": self._bytes,
+            "max_size": self.max_size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _discard(self, trip_key: str) -> None:
+        """Remove a trip and its id index entries."""
+        entry = self._trips.pop(trip_key, None)
+        if entry is None:
+            return
+        for itinerary in entry.itineraries:
+            # A later trip may hold the same itinerary; leave its entry alone
+            indexed = self._by_id.get(itinerary.id)
+            if indexed is not None and indexed[0] == trip_key:
+                del self._by_id[itinerary.id]
+                del self._ids[bisect.bisect_left(self._ids, itinerary.id)]
+        self._size -= len(entry.itineraries)
+        self._bytes -= entry.size_bytes
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used trips until the store fits its limits."""
+        while self._over_limit() and len(self._trips) > 1:
+            trip_key = next(iter(self._trips))
+            if trip_key == keep:
+                self._trips.move_to_end(trip_key)
+                continue
+            self._discard(trip_key)
+            self._stats["evictions"] += 1
+
+    def _over_limit(self) -> bool:
+        """Whether the store holds more than its size or memory limit."""
+        return self._size > self.max_size or (0 < self.max_bytes < self._bytes)
+
+    def _purge_expired(self, now: float) -> None:
+        """Drop trips whose itineraries are older than the TTL."""
+        if self._ids:
+            self._stats["expirations"] += self.evict_before(now - self.ttl_seconds)
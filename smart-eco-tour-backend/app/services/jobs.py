@@ -0,0 +1,198 @@
+"""In-process background job queue for long-running generation work."""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.models.schemas import JobStatus
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """A unit of work tracked by the JobQueue."""
+
+    def __init__(self, payload: Any):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = JobStatus.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self._done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has succeeded or failed."""
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def to_dict(self) -> dict:
+        """Summarise the job for API responses (without the result)."""
+        return {
+            "job_id": self.id,
+            "job_status": self.status.value,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded queue of jobs processed by a fixed pool of asyncio workers.
+
+    Finished jobs are kept for ``ttl_seconds`` so clients can poll for
+    their results, then dropped.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[Any]],
+        workers: int = 2,
+        max_queue_size: int = 100,
+        ttl_seconds: float = 3600,
+    ):
+        """Create the queue.
+
+        Args:
+            handler: Coroutine function run with each job's payload
+            workers: Number of jobs processed concurrently
+            max_queue_size: Maximum number of queued (not yet running) jobs
+            ttl_seconds: How long finished jobs are kept
+        """
+        self.handler = handler
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._last_purge = 0.0
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop (idempotent)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [
+            asyncio.ensure_future(self._worker())
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers and wait for them to exit."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, payload: Any) -> Job:
+        """Queue a job.
+
+        Args:
+            payload: Argument passed to the handler
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        self.start()
+        self._purge_expired()
+
+        job = Job(payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting)")
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            The job, or None if unknown or expired
+        """
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """Wait up to timeout seconds for a job to finish (long-polling).
+
+        Args:
+            job: Job to wait for
+            timeout: Maximum seconds to wait
+
+        Returns:
+            The job, finished or not
+        """
+        if not job.finished and timeout > 0:
+            try:
+                await asyncio.wait_for(job._done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        """Get queue statistics.
+
+        Returns:
+            Dict of job counts by status plus queue settings
+        """
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {
+            **counts,
+            "workers": self.workers,
+            "max_queue_size": self.max_queue_size,
+        }
+
+    async def _worker(self) -> None:
+        """Process jobs from the queue until cancelled."""
+        while True:
+            job = await self._queue.get()
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await self.handler(job.payload)
+                job.status = JobStatus.SUCCEEDED
+            except asyncio.CancelledError:
+                job.status = JobStatus.FAILED
+                job.error = "Job cancelled"
+                raise
+            except Exception as e:
+                print(f"❌ Job {job.id} failed: {e}")
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                job._done.set()
+                self._queue.task_done()
+
+    def _purge_expired(self) -> None:
+        """Drop finished jobs older than the TTL (at most once per second)."""
+        now = time.time()
+        if now - self._last_purge < 1.0:
+            return
+        self._last_purge = now
+
+        cutoff = now - self.ttl_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
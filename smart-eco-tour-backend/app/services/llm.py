@@ -1,14 +1,49 @@
 """LLM integration for itinerary generation."""
+import asyncio
 import os
-from typing import Optional
+import threading
+from typing import Dict, Optional
 from dotenv import load_dotenv
 import json
 
+import httpx
+
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from app.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_MAX_CONNECTIONS,
+)
+from app.services.llm_cache import LLMResponseCache
+
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_MODEL = "openai/gpt-oss-20b"
+GROQ_TEMPERATURE = 0.7
+GROQ_MAX_TOKENS = 4096
+SYSTEM_PROMPT = "You are an expert sustainable travel consultant. Create detailed, eco-friendly travel itineraries that minimize environmental impact while maximizing authentic local experiences."
+
+LLM_CACHE: Optional[LLMResponseCache] = (
+    LLMResponseCache(
+        max_entries=LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds=LLM_CACHE_TTL,
+        path=LLM_CACHE_PATH or None,
+    )
+    if LLM_CACHE_ENABLED
+    else None
+)
+
+# Shared Groq clients (see get_groq_client)
+_groq_clients: Dict[int, ChatGroq] = {}
+_groq_clients_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+
 TEMPLATE_ITINERARIES = {
     "eco_focused": {
         "title": "Sustainable Explorer",
@@ -202,36 +237,153 @@ def call_groq(prompt: str, timeout: int = 30) -> Optional[str]:
     Returns:
         Generated itinerary text or None if API unavailable
     """
-    if not GROQ_API_KEY or GROQ_API_KEY.startswith("your_"):
+    cache_key = _cache_key(prompt)
+    if LLM_CACHE is not None:
+        cached = LLM_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    if not _groq_configured():
         print("⚠️  Groq API key not configured. Using fallback template.")
         return None
-    
+
     try:
-        # Initialize LangChain ChatGroq client
-        llm = ChatGroq(
-            api_key=GROQ_API_KEY,
-            model="openai/gpt-oss-20b",
-            temperature=0.7,
-            max_tokens=4096,
-            timeout=timeout,
-        )
-        
-        # Create messages
-        messages = [
-            SystemMessage(content="You are an expert sustainable travel consultant. Create detailed, eco-friendly travel itineraries that minimize environmental impact while maximizing authentic local experiences."),
-            HumanMessage(content=prompt)
-        ]
-        
+        llm = get_groq_client(timeout)
+
         # Invoke the model
-        response = llm.invoke(messages)
-        
-        return response.content
+        response = llm.invoke(_build_messages(prompt))
+
+    except Exception as e:
+        print(f"⚠️  Groq API call failed: {e}. Using fallback template.")
+        return None
+
+    if LLM_CACHE is not None and response.content:
+        LLM_CACHE.set(cache_key, response.content)
+    return response.content
+
+
+async def call_groq_async(prompt: str, timeout: int = 30) -> Optional[str]:
+    """Call Groq API without blocking the event loop.
+
+    Args:
+        prompt: The prompt for itinerary generation
+        timeout: Request timeout in seconds (default 30)
+
+    Returns:
+        Generated itinerary text or None if API unavailable
+    """
+    cache_key = _cache_key(prompt)
+    if LLM_CACHE is not None:
+        # The disk tier does blocking I/O, so keep it off the event loop
+        cached = await asyncio.to_thread(LLM_CACHE.get, cache_key)
+        if cached is not None:
+            return cached
+
+    if not _groq_configured():
+        print("⚠️  Groq API key not configured. Using fallback template.")
+        return None
+
+    try:
+        llm = get_groq_client(timeout)
+
+        # Invoke the model through the async HTTP client
+        response = await llm.ainvoke(_build_messages(prompt))
 
     except Exception as e:
         print(f"⚠️  Groq API call failed: {e}. Using fallback template.")
         return None
+
+    if LLM_CACHE is not None and response.content:
+        await asyncio.to_thread(LLM_CACHE.set, cache_key, response.content)
+    return response.content
+
+
+def _cache_key(prompt: str) -> str:
+    """Build the response cache key for a prompt and the model parameters."""
+    return LLMResponseCache.make_key(
+        prompt,
+        model=GROQ_MODEL,
+        temperature=GROQ_TEMPERATURE,
+        max_tokens=GROQ_MAX_TOKENS,
+        system_prompt=SYSTEM_PROMPT,
+    )
+
+
+def _groq_configured() -> bool:
+    """Check whether a usable Groq API key is set."""
+    return bool(GROQ_API_KEY) and not GROQ_API_KEY.startswith("your_")
+
+
+def get_groq_client(timeout: int = 30) -> ChatGroq:
+    """Get the shared ChatGroq client, creating it on first use.
+    
+    Clients are cached per timeout and all share one pair of keep-alive
+    HTTP connection pools, so connection and TLS setup happen once per
+    worker rather than once per itinerary.
+    
+    Args:
+        timeout: Request timeout in seconds
+        
+    Returns:
+        Long-lived ChatGroq client
+    """
+    global _http_client, _http_async_client
+    
+    client = _groq_clients.get(timeout)
+    if client is not None:
+        return client
+    
+    with _groq_clients_lock:
+        client = _groq_clients.get(timeout)
+        if client is None:
+            if _http_client is None:
+                limits = httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                )
+                _http_client = httpx.Client(limits=limits)
+                _http_async_client = httpx.AsyncClient(limits=limits)
+            
+            client = ChatGroq(
+                api_key=GROQ_API_KEY,
+                model=GROQ_MODEL,
+                temperature=GROQ_TEMPERATURE,
+                max_tokens=GROQ_MAX_TOKENS,
+                timeout=timeout,
+                http_client=_http_client,
+                http_async_client=_http_async_client,
+            )
+            _groq_clients[timeout] = client
+    return client
+
+
+async def close_groq_client() -> None:
+    """Close the shared Groq HTTP connection pools."""
+    global _http_client, _http_async_client
+    
+    with _groq_clients_lock:
+        http_client, http_async_client = _http_client, _http_async_client
+        _http_client = _http_async_client = None
+        _groq_clients.clear()
+    
+    if http_async_client is not None:
+        await http_async_client.aclose()
+    if http_client is not None:
+        http_client.close()
+
+
+def _build_messages(prompt: str) -> list:
+    """Create the chat messages for an itinerary prompt."""
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=prompt)
+    ]
+
+
 # Keep call_gemini as alias for backward compatibility
 call_gemini = call_groq
+call_gemini_async = call_groq_async
 
 
 def get_template_itinerary(
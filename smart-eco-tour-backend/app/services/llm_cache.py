@@ -0,0 +1,208 @@
+"""Prompt-keyed cache for LLM responses."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+
+class LLMResponseCache:
+    """Two-tier LLM response cache: in-memory LRU in front of a SQLite file.
+
+    Entries expire after ``ttl_seconds`` in both tiers. The SQLite tier
+    survives restarts, so repeat trips skip the LLM after a redeploy too.
+    Disk errors (locked or corrupt file, full disk) are logged and treated
+    as misses or skipped writes, so they never fail a request; if the file
+    cannot even be opened, the cache runs in memory only.
+
+    All methods are thread-safe. The memory tier and the SQLite connection
+    have separate locks, so disk I/O never blocks memory hits or stats().
+    """
+
+    # Expired rows are purged from disk every this many writes
+    PURGE_INTERVAL = 100
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 86400,
+        path: Optional[Union[str, Path]] = None,
+    ):
+        """Create the cache.
+
+        Args:
+            max_entries: Maximum number of responses held in memory
+            ttl_seconds: Time-to-live for cached responses
+            path: SQLite file for the disk tier (None for memory only)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Guards the memory tier and counters
+        self._lock = threading.Lock()
+        # Guards the SQLite connection
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = self._open(Path(path))
+
+    @staticmethod
+    def make_key(prompt: str, **params) -> str:
+        """Build a canonical cache key for a prompt and model parameters.
+
+        Args:
+            prompt: Prompt text
+            **params: Model parameters that affect the response
+
+        Returns:
+            Hex SHA-256 digest of the canonical request
+        """
+        canonical = json.dumps(
+            {"prompt": prompt, "params": params},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response, promoting disk hits to memory.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached response or None on miss/expiry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, response = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+
+        row = None
+        with self._db_lock:
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT response, created_at FROM llm_cache WHERE key = ?",
+                        (key,),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"⚠️  LLM cache read failed: {e}. Treating as a miss.")
+
+        with self._lock:
+            if row is not None and now - row[1] < self.ttl_seconds:
+                self._remember(key, row[1], row[0])
+                self._stats["disk_hits"] += 1
+                return row[0]
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response in both tiers.
+
+        Args:
+            key: Cache key from make_key
+            response: LLM response text
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+            self._stats["writes"] += 1
+
+        with self._db_lock:
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)",
+                        (key, response, now),
+                    )
+                    self._db.commit()
+                    self._writes += 1
+                    if self._writes % self.PURGE_INTERVAL == 0:
+                        self._purge_expired(self._db)
+                except sqlite3.Error as e:
+                    print(f"⚠️  LLM cache write failed: {e}. Response kept in memory only.")
+
+    def clear(self) -> None:
+        """Drop all cached responses from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM llm_cache")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️  LLM cache clear failed: {e}. Disk entries kept.")
+
+    def stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and current size.
+
+        Returns:
+            Dict of cache statistics
+        """
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "hits": hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_enabled": self._db is not None,
+            }
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _open(self, path: Path) -> Optional[sqlite3.Connection]:
+        """Open the disk tier, or return None (memory only) if that fails."""
+        db = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(path), check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._purge_expired(db)
+            return db
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️  LLM cache disk tier unavailable ({path}): {e}. Caching in memory only.")
+            if db is not None:
+                db.close()
+            return None
+
+    def _remember(self, key: str, created_at: float, response: str) -> None:
+        """Insert into the memory tier, evicting least recently used entries."""
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _purge_expired(self, db: sqlite3.Connection) -> None:
+        """Delete expired rows from the disk tier."""
+        db.execute(
+            "DELETE FROM llm_cache WHERE created_at < ?",
+            (time.time() - self.ttl_seconds,),
+        )
+        db.commit()
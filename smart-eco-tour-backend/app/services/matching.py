@@ -1,6 +1,7 @@
 """Itinerary matching and generation logic."""
+import asyncio
 import random
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from app.models.schemas import (
     Itinerary,
     DayPlan,
@@ -8,14 +9,20 @@ from app.models.schemas import (
     TransportMode,
     ActivityType,
 )
+from app.config import ITINERARY_OPTIMIZER_ENABLED
+from app.services.activity_index import ActivityIndex
+from app.services.optimizer import optimise_activities
 from app.services.scoring import calculate_itinerary_sustainability
 from app.services.llm import (
     generate_prompt_for_itinerary,
     call_gemini,
+    call_gemini_async,
     parse_llm_itinerary,
     get_template_itinerary,
 )
 from app.data.carbon import estimate_distance, get_carbon_for_transport
+from app.utils.concurrency import run_cpu_bound
+from app.utils.ids import ITINERARY_IDS
 
 
 ACTIVITY_DATABASE = {
@@ -104,6 +111,37 @@ ACTIVITY_DATABASE = {
     },
 }
 
+# Used for destinations without their own activities
+GENERIC_ACTIVITIES = {
+    ActivityType.NATURE: [
+        {"name": "City Park Walk", "duration": 2.0, "location": "City parks"},
+        {"name": "Botanical Garden Visit", "duration": 2.0, "location": "Botanical garden"},
+        {"name": "Riverside or Coastal Walk", "duration": 2.5, "location": "Waterfront"},
+    ],
+    ActivityType.CULTURE: [
+        {"name": "Guided Walking Tour", "duration": 2.5, "location": "Old Town"},
+        {"name": "City Museum", "duration": 2.0, "location": "City Centre"},
+        {"name": "Historic Landmarks Tour", "duration": 3.0, "location": "City Centre"},
+    ],
+    ActivityType.ADVENTURE: [
+        {"name": "Bike Tour", "duration": 3.0, "location": "Various"},
+        {"name": "Kayak or Boat Trip", "duration": 2.0, "location": "Waterfront"},
+    ],
+    ActivityType.LOCAL: [
+        {"name": "Local Market Visit", "duration": 2.0, "location": "Local market"},
+        {"name": "Neighbourhood Café Stop", "duration": 1.5, "location": "Various"},
+        {"name": "Artisan Workshop", "duration": 2.5, "location": "Various"},
+    ],
+    ActivityType.FOOD: [
+        {"name": "Street Food Tasting", "duration": 2.0, "location": "Food district"},
+        {"name": "Cooking Class", "duration": 3.0, "location": "City Centre"},
+        {"name": "Farm-to-Table Dinner", "duration": 2.0, "location": "Various"},
+    ],
+}
+
+# Compiled once; select_activities samples from these
+ACTIVITY_INDEX = ActivityIndex(ACTIVITY_DATABASE, fallback=GENERIC_ACTIVITIES)
+
 ACCOMMODATION_OPTIONS = {
     "eco_hotel": {"carbon": 8.5, "description": "Eco-certified sustainable hotel"},
     "hotel": {"carbon": 15.0, "description": "Standard hotel"},
@@ -121,6 +159,14 @@ def select_activities(
 ) -> List[Dict]:
     """Select activities based on interests and sustainability.
     
+    Each day gets one activity per top interest, then is filled with
+    activities drawn without replacement from the destination's weighted
+    sampler (favouring the traveler's interests and, as
+    sustainability_preference grows, the more sustainable activity types).
+    Activities are not repeated within a day; days of small catalogues get
+    fewer activities. Destinations without a catalogue use generic
+    activities. Work per day is bounded by the catalogue size.
+    
     Args:
         destination: Target destination
         days: Number of days
@@ -130,53 +176,52 @@ def select_activities(
     Returns:
         List of selected activities
     """
-    destination_activities = ACTIVITY_DATABASE.get(destination, {})
+    catalogue = ACTIVITY_INDEX.get(destination)
+    if catalogue is None:
+        return []
+    if not ACTIVITY_INDEX.has_catalogue(destination):
+        print(f"⚠️  No activities for {destination}, using generic activities")
+    
+    eco_transport = sustainability_preference > 0.5
+    interest_set = frozenset(interests or ())
     
     selected = []
     activities_per_day = 4 + int(days / 2)
+    # A day cannot hold more distinct activities than the catalogue has
+    slots = min(activities_per_day, 5, len(catalogue))
     
     for day in range(days):
         day_activities = []
+        chosen = set()
         
         if interests:
             # Prioritize user interests
             for interest in interests[:2]:
-                activities = destination_activities.get(interest, [])
-                if activities:
-                    activity = random.choice(activities)
-                    day_activities.append({
-                        "type": interest,
-                        "name": activity["name"],
-                        "duration": activity["duration"],
-                        "location": activity["location"],
-                        "transport": random.choice([TransportMode.WALK, TransportMode.BUS])
-                        if sustainability_preference > 0.5
+                index = catalogue.choose_of_type(interest)
+                if index is not None and index not in chosen:
+                    chosen.add(index)
+                    day_activities.append(catalogue.activity(
+                        index,
+                        random.choice([TransportMode.WALK, TransportMode.BUS])
+                        if eco_transport
                         else random.choice([TransportMode.CAR, TransportMode.BUS]),
-                        "distance": random.uniform(1, 10),
-                    })
+                        random.uniform(1, 10),
+                    ))
         
-        # Fill remaining slots with random activities
-        while len(day_activities) < min(activities_per_day, 5):
-            all_activities = []
-            for activity_type, acts in destination_activities.items():
-                all_activities.extend([
-                    {
-                        **act,
-                        "type": activity_type,
-                        "transport": random.choice([
-                            TransportMode.WALK,
-                            TransportMode.BUS,
-                            TransportMode.TRAIN,
-                        ]) if sustainability_preference > 0.5 else TransportMode.CAR,
-                        "distance": random.uniform(1, 15),
-                    }
-                    for act in acts
-                ])
-            
-            if all_activities:
-                activity = random.choice(all_activities)
-                if activity not in day_activities:
-                    day_activities.append(activity)
+        # Fill remaining slots with weighted random activities
+        for index in catalogue.sample_distinct(
+            slots - len(day_activities),
+            interest_set,
+            sustainability_preference,
+            chosen,
+        ):
+            day_activities.append(catalogue.activity(
+                index,
+                random.choice([TransportMode.WALK, TransportMode.BUS, TransportMode.TRAIN])
+                if eco_transport
+                else TransportMode.CAR,
+                random.uniform(1, 15),
+            ))
         
         selected.extend(day_activities[:activities_per_day])
     
@@ -203,10 +248,28 @@ def generate_day_plan(
     if not day_activities_list:
         day_activities_list = activities[:3]
     
+    return format_day_plan(day, destination, day_activities_list[:4])
+
+
+def format_day_plan(
+    day: int,
+    destination: str,
+    activities: List[Dict],
+) -> DayPlan:
+    """Lay out a day's activities from 9 AM with an hour between them.
+    
+    Args:
+        day: Day number
+        destination: Destination city
+        activities: The day's activities, in order
+        
+    Returns:
+        DayPlan object
+    """
     day_activity_objects = []
     current_time = 9  # Start at 9 AM
     
-    for activity in day_activities_list[:4]:
+    for activity in activities:
         day_activity_objects.append(
             DayActivity(
                 time=f"{current_time:02d}:00",
@@ -254,59 +317,140 @@ def generate_itinerary(
     Returns:
         Complete Itinerary object
     """
-    if interests is None:
-        interests = [ActivityType.CULTURE, ActivityType.NATURE]
-    
-    if sustainability_weights is None:
-        sustainability_weights = {
-            "carbon": 0.4,
-            "local": 0.3,
-            "culture": 0.2,
-            "overtourism": 0.1,
-        }
+    interests, sustainability_weights = _apply_defaults(interests, sustainability_weights)
     
     # Try LLM-powered generation first
     llm_itinerary = None
     if use_llm:
-        try:
-            prompt = generate_prompt_for_itinerary(
-                origin=origin,
-                destination=destination,
-                days=days,
-                transport_preference=str(transport_preference.value) if hasattr(transport_preference, 'value') else str(transport_preference),
-                sustainability_weights=sustainability_weights,
-                interests=[str(i.value) if hasattr(i, 'value') else str(i) for i in interests],
-            )
-            llm_response = call_gemini(prompt)
-            # Don't print the full response - it can be huge and slow down output
-            if llm_response:
-                llm_itinerary = parse_llm_itinerary(llm_response)
-                print(f"✅ LLM generated itinerary for {destination}")
-        except Exception as e:
-            print(f"⚠️ LLM generation failed: {e}, falling back to template")
+        llm_itinerary = generate_llm_itinerary(
+            origin, destination, days, transport_preference, interests, sustainability_weights
+        )
+    
+    return build_itinerary(
+        origin=origin,
+        destination=destination,
+        days=days,
+        transport_preference=transport_preference,
+        interests=interests,
+        llm_itinerary=llm_itinerary,
+    )
+
+
+async def generate_itinerary_async(
+    origin: str,
+    destination: str,
+    days: int,
+    transport_preference: TransportMode,
+    interests: List[ActivityType] = None,
+    sustainability_weights: Dict[str, float] = None,
+    use_llm: bool = True,
+) -> Itinerary:
+    """Generate complete itinerary without blocking the event loop.
     
+    The LLM call is awaited on the async client and the CPU-bound
+    activity selection and scoring run on the shared bounded executor.
+    
+    Args:
+        origin: Starting location
+        destination: Target destination
+        days: Number of days
+        transport_preference: Preferred transport
+        interests: User interests
+        sustainability_weights: Sustainability priorities
+        use_llm: Whether to use LLM for generation
+        
+    Returns:
+        Complete Itinerary object
+    """
+    interests, sustainability_weights = _apply_defaults(interests, sustainability_weights)
+    
+    llm_itinerary = None
+    if use_llm:
+        llm_itinerary = await generate_llm_itinerary_async(
+            origin, destination, days, transport_preference, interests, sustainability_weights
+        )
+    
+    return await run_cpu_bound(
+        build_itinerary,
+        origin=origin,
+        destination=destination,
+        days=days,
+        transport_preference=transport_preference,
+        interests=interests,
+        llm_itinerary=llm_itinerary,
+    )
+
+
+def build_itinerary(
+    origin: str,
+    destination: str,
+    days: int,
+    transport_preference: TransportMode,
+    interests: List[ActivityType],
+    llm_itinerary: Optional[dict] = None,
+    option: int = 0,
+) -> Itinerary:
+    """Build and score an itinerary from the activity catalogue.
+    
+    This is the CPU-bound part of generation and makes no network calls.
+    With ITINERARY_OPTIMIZER_ENABLED, each day's activities are chosen by
+    the optimiser and the itinerary is scored on exactly those activities;
+    otherwise activities are sampled and spread over days at random.
+    
+    Args:
+        origin: Starting location
+        destination: Target destination
+        days: Number of days
+        transport_preference: Preferred transport
+        interests: User interests
+        llm_itinerary: Parsed LLM itinerary used for title and description
+        option: Option number, giving alternative optimised plans
+        
+    Returns:
+        Complete Itinerary object
+    """
     print(f"📍 Step 1: Estimating distance...")
     # Estimate distance
     distance = estimate_distance(origin, destination)
     print(f"📍 Step 2: Distance = {distance} km")
     sustainability_score = min(100.0, (1 - (distance / 10000)) * 100)  # Penalize long distances
     
-    print(f"📍 Step 3: Selecting activities...")
-    # Generate activities
-    activities = select_activities(
-        destination,
-        days,
-        interests,
-        sustainability_score / 100,
-    )
-    print(f"📍 Step 4: Selected {len(activities)} activities")
-    
-    # Generate day plans
-    print(f"📍 Step 5: Generating day plans...")
-    day_plans = []
-    for day in range(1, days + 1):
-        day_plan = generate_day_plan(day, destination, activities)
-        day_plans.append(day_plan)
+    catalogue = ACTIVITY_INDEX.get(destination)
+    if ITINERARY_OPTIMIZER_ENABLED and catalogue is not None:
+        print(f"📍 Step 3: Optimising activities...")
+        daily_activities = optimise_activities(
+            catalogue,
+            destination,
+            days,
+            interests,
+            sustainability_score / 100,
+            option=option,
+        )
+        activities = [activity for day_activities in daily_activities for activity in day_activities]
+        print(f"📍 Step 4: Planned {len(activities)} activities")
+        
+        print(f"📍 Step 5: Generating day plans...")
+        day_plans = [
+            format_day_plan(day, destination, day_activities)
+            for day, day_activities in enumerate(daily_activities, start=1)
+        ]
+    else:
+        print(f"📍 Step 3: Selecting activities...")
+        # Generate activities
+        activities = select_activities(
+            destination,
+            days,
+            interests,
+            sustainability_score / 100,
+        )
+        print(f"📍 Step 4: Selected {len(activities)} activities")
+        
+        # Generate day plans
+        print(f"📍 Step 5: Generating day plans...")
+        day_plans = []
+        for day in range(1, days + 1):
+            day_plan = generate_day_plan(day, destination, activities)
+            day_plans.append(day_plan)
     print(f"📍 Step 6: Generated {len(day_plans)} day plans")
     
     # Calculate sustainability
@@ -322,23 +466,128 @@ def generate_itinerary(
     )
     print(f"📍 Step 8: Sustainability calculated")
     
-    # Use LLM-enhanced title and description if available
-    title = f"Sustainable {days}-Day {destination} Adventure"
-    description = f"Eco-conscious itinerary from {origin} to {destination}"
-    
-    if llm_itinerary and not llm_itinerary.get("fallback"):
-        title = llm_itinerary.get("title", title)
-        description = llm_itinerary.get("description", description)
-    
     print(f"📍 Step 9: Creating Itinerary object...")
-    return Itinerary(
-        id=random.randint(1, 10000),
-        title=title,
-        description=description,
+    itinerary = Itinerary(
+        id=ITINERARY_IDS.next_id(),
+        title=f"Sustainable {days}-Day {destination} Adventure",
+        description=f"Eco-conscious itinerary from {origin} to {destination}",
         days=day_plans,
         sustainability=sustainability,
         preferred_transport=transport_preference,
     )
+    
+    # Use LLM-enhanced title and description if available
+    return apply_llm_itinerary(itinerary, llm_itinerary)
+
+
+def apply_llm_itinerary(itinerary: Itinerary, llm_itinerary: Optional[dict]) -> Itinerary:
+    """Apply an LLM-generated title and description to an itinerary.
+    
+    Args:
+        itinerary: Catalogue-built itinerary
+        llm_itinerary: Parsed LLM itinerary (or None)
+        
+    Returns:
+        The itinerary, copied with LLM text when available
+    """
+    if not llm_itinerary or llm_itinerary.get("fallback"):
+        return itinerary
+    
+    return itinerary.model_copy(update={
+        "title": llm_itinerary.get("title", itinerary.title),
+        "description": llm_itinerary.get("description", itinerary.description),
+    })
+
+
+def generate_llm_itinerary(
+    origin: str,
+    destination: str,
+    days: int,
+    transport_preference: TransportMode,
+    interests: List[ActivityType],
+    sustainability_weights: Dict[str, float],
+) -> Optional[dict]:
+    """Ask the LLM for an itinerary and parse the response.
+    
+    Returns:
+        Parsed LLM itinerary, or None if the LLM is unavailable or failed
+    """
+    try:
+        prompt = _build_prompt(origin, destination, days, transport_preference, interests, sustainability_weights)
+        llm_response = call_gemini(prompt)
+        return _parse_llm_response(llm_response, destination)
+    except Exception as e:
+        print(f"⚠️ LLM generation failed: {e}, falling back to template")
+        return None
+
+
+async def generate_llm_itinerary_async(
+    origin: str,
+    destination: str,
+    days: int,
+    transport_preference: TransportMode,
+    interests: List[ActivityType],
+    sustainability_weights: Dict[str, float],
+) -> Optional[dict]:
+    """Async variant of generate_llm_itinerary using the async LLM client.
+    
+    Returns:
+        Parsed LLM itinerary, or None if the LLM is unavailable or failed
+    """
+    try:
+        prompt = _build_prompt(origin, destination, days, transport_preference, interests, sustainability_weights)
+        llm_response = await call_gemini_async(prompt)
+        return _parse_llm_response(llm_response, destination)
+    except Exception as e:
+        print(f"⚠️ LLM generation failed: {e}, falling back to template")
+        return None
+
+
+def _apply_defaults(
+    interests: Optional[List[ActivityType]],
+    sustainability_weights: Optional[Dict[str, float]],
+) -> Tuple[List[ActivityType], Dict[str, float]]:
+    """Fill in default interests and sustainability weights."""
+    if interests is None:
+        interests = [ActivityType.CULTURE, ActivityType.NATURE]
+    
+    if sustainability_weights is None:
+        sustainability_weights = {
+            "carbon": 0.4,
+            "local": 0.3,
+            "culture": 0.2,
+            "overtourism": 0.1,
+        }
+    
+    return interests, sustainability_weights
+
+
+def _build_prompt(
+    origin: str,
+    destination: str,
+    days: int,
+    transport_preference: TransportMode,
+    interests: List[ActivityType],
+    sustainability_weights: Dict[str, float],
+) -> str:
+    """Build the LLM prompt for an itinerary request."""
+    return generate_prompt_for_itinerary(
+        origin=origin,
+        destination=destination,
+        days=days,
+        transport_preference=str(transport_preference.value) if hasattr(transport_preference, 'value') else str(transport_preference),
+        sustainability_weights=sustainability_weights,
+        interests=[str(i.value) if hasattr(i, 'value') else str(i) for i in interests],
+    )
+
+
+def _parse_llm_response(llm_response: Optional[str], destination: str) -> Optional[dict]:
+    """Parse an LLM response, returning None when the call produced nothing."""
+    # Don't print the full response - it can be huge and slow down output
+    if not llm_response:
+        return None
+    print(f"✅ LLM generated itinerary for {destination}")
+    return parse_llm_itinerary(llm_response)
 
 
 def generate_multiple_itineraries(
@@ -351,6 +600,11 @@ def generate_multiple_itineraries(
 ) -> List[Itinerary]:
     """Generate multiple itinerary options.
     
+    Everything runs on the calling thread. This never submits to the shared
+    executor, so it is safe to call from code already running there (e.g.
+    via run_cpu_bound); async callers should use
+    generate_multiple_itineraries_async instead.
+    
     Args:
         origin: Starting location
         destination: Target destination
@@ -363,26 +617,144 @@ def generate_multiple_itineraries(
         List of itineraries
     """
     print("Entering generate_multiple_itineraries function")
+    interests, sustainability_weights = _apply_defaults(interests, None)
     
-    itineraries = []
+    print(f"Generating {count} itineraries")
+    itineraries = [
+        build_itinerary(
+            origin=origin,
+            destination=destination,
+            days=days,
+            transport_preference=transport_preference,
+            interests=interests,
+            option=option,
+        )
+        for option in range(count)
+    ]
+    
+    # Only the first itinerary uses the LLM, the rest are template-based (faster)
+    llm_itinerary = generate_llm_itinerary(
+        origin, destination, days, transport_preference, interests, sustainability_weights
+    )
+    itineraries[0] = apply_llm_itinerary(itineraries[0], llm_itinerary)
+    
+    return _sort_itineraries(itineraries)
+
+
+async def generate_multiple_itineraries_async(
+    origin: str,
+    destination: str,
+    days: int,
+    transport_preference: TransportMode,
+    interests: List[ActivityType] = None,
+    count: int = 3,
+) -> List[Itinerary]:
+    """Generate multiple itinerary options without blocking the event loop.
+    
+    The LLM call is overlapped with the catalogue-based options, which are
+    fanned out to the shared executor, so latency is close to the slowest
+    single option rather than the sum of all of them.
+    
+    Args:
+        origin: Starting location
+        destination: Target destination
+        days: Number of days
+        transport_preference: Preferred transport
+        interests: User interests
+        count: Number of itineraries to generate
+        
+    Returns:
+        List of itineraries sorted by sustainability score
+    """
+    print("Entering generate_multiple_itineraries_async function")
+    
+    itineraries: List[Optional[Itinerary]] = [None] * count
+    async for index, itinerary, _ in stream_itineraries(
+        origin=origin,
+        destination=destination,
+        days=days,
+        transport_preference=transport_preference,
+        interests=interests,
+        count=count,
+    ):
+        # The LLM-enhanced update replaces the template version of its option
+        itineraries[index] = itinerary
+    
+    return _sort_itineraries(itineraries)
+
+
+async def stream_itineraries(
+    origin: str,
+    destination: str,
+    days: int,
+    transport_preference: TransportMode,
+    interests: List[ActivityType] = None,
+    count: int = 3,
+) -> AsyncIterator[Tuple[int, Itinerary, bool]]:
+    """Yield itinerary options as soon as each one is ready.
+    
+    Catalogue-based options are yielded as they finish on the shared
+    executor. When the LLM call returns, the first option is yielded again
+    with the LLM title and description (same id), so consumers should
+    replace the earlier version of that option.
     
-    # Only use LLM for the first itinerary, use templates for the rest (faster)
-    for i in range(count):
-        use_llm = (i == 0)  # Only first itinerary uses LLM
-        print(f"Generating itinerary {i+1}/{count} (use_llm={use_llm})")
+    Args:
+        origin: Starting location
+        destination: Target destination
+        days: Number of days
+        transport_preference: Preferred transport
+        interests: User interests
+        count: Number of itineraries to generate
         
-        itinerary = generate_itinerary(
+    Yields:
+        Tuples of (option index, itinerary, llm_enhanced)
+    """
+    interests, sustainability_weights = _apply_defaults(interests, None)
+    
+    print(f"Generating {count} itineraries in parallel")
+    # Only the first itinerary uses the LLM, the rest are template-based (faster)
+    llm_task = asyncio.ensure_future(generate_llm_itinerary_async(
+        origin, destination, days, transport_preference, interests, sustainability_weights
+    ))
+    build_tasks = {
+        asyncio.ensure_future(run_cpu_bound(
+            build_itinerary,
             origin=origin,
             destination=destination,
             days=days,
             transport_preference=transport_preference,
             interests=interests,
-            use_llm=use_llm,
-        )
-        itineraries.append(itinerary)
-        print(f"✅ Itinerary {i+1} generated successfully")
+            option=index,
+        )): index
+        for index in range(count)
+    }
     
-    # Sort by sustainability score (descending)
+    pending = set(build_tasks) | {llm_task}
+    first_option = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is llm_task:
+                    continue
+                index = build_tasks[task]
+                if index == 0:
+                    first_option = task.result()
+                yield index, task.result(), False
+            
+            if first_option is not None and llm_task.done():
+                enhanced = apply_llm_itinerary(first_option, llm_task.result())
+                if enhanced is not first_option:
+                    yield 0, enhanced, True
+                first_option = None
+    finally:
+        # Stop outstanding work if the consumer goes away early
+        for task in pending:
+            task.cancel()
+
+
+def _sort_itineraries(itineraries: List[Itinerary]) -> List[Itinerary]:
+    """Sort itineraries by sustainability score (descending)."""
     itineraries.sort(
         key=lambda x: x.sustainability.total_score,
         reverse=True,
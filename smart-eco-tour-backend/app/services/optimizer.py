@@ -0,0 +1,339 @@
+"""Sustainability-driven activity planning for itineraries."""
+import math
+import random
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+from app.config import (
+    ITINERARY_DAY_HOURS,
+    ITINERARY_MAX_DAILY_ACTIVITIES,
+    ITINERARY_MIN_DAILY_ACTIVITIES,
+    SCORING_WEIGHTS,
+)
+from app.models.schemas import ActivityType, TransportMode
+from app.services.activity_index import DestinationCatalogue
+from app.services.scoring import (
+    TRANSPORT_SCORES,
+    calculate_activity_score,
+    calculate_local_engagement_score,
+)
+
+# Hours between activities, matching the day plan time slots
+TRANSIT_HOURS = 1
+
+# Longest distance (km) planned on foot
+WALK_MAX_KM = 2.5
+
+# Score points for each of the traveler's interests covered in a day
+INTEREST_BONUS = 10.0
+
+# Utility kept each time an activity repeats one from an earlier day
+REPEAT_DECAY = 0.7
+
+# Relative utility noise for alternative options (option 0 has none)
+OPTION_JITTER = 0.15
+
+# Local-search passes over each day's plan
+SWAP_PASSES = 2
+
+
+def activity_distance(destination: str, name: str) -> float:
+    """Get a stable distance estimate (1-15 km) to an activity.
+
+    Args:
+        destination: Destination city
+        name: Activity name
+
+    Returns:
+        Distance in km, the same for every call with the same arguments
+    """
+    digest = zlib.crc32(f"{destination}:{name}".encode("utf-8"))
+    return 1.0 + (digest % 1401) / 100
+
+
+def transport_for(distance: float, sustainability_preference: float) -> TransportMode:
+    """Pick the most sustainable practical way to reach an activity.
+
+    Args:
+        distance: Distance in km
+        sustainability_preference: Preference score (0-1)
+
+    Returns:
+        Transport mode
+    """
+    if distance <= WALK_MAX_KM:
+        return TransportMode.WALK
+    if sustainability_preference > 0.5:
+        return max((TransportMode.BUS, TransportMode.TRAIN), key=lambda mode: TRANSPORT_SCORES[mode.value])
+    return TransportMode.CAR
+
+
+def activity_utility(activity: Dict, destination: str) -> float:
+    """Score points an activity contributes to the itinerary score.
+
+    The activity-dependent sub-scores (transport, activity, local
+    engagement) are averages over activities, so the itinerary score is
+    the mean of these per-activity contributions plus terms that do not
+    depend on the activities chosen.
+
+    Args:
+        activity: Activity dict
+        destination: Destination city
+
+    Returns:
+        Weighted score contribution
+    """
+    activities = [activity]
+    return (
+        SCORING_WEIGHTS["transport"] * TRANSPORT_SCORES.get(activity["transport"], 50)
+        + SCORING_WEIGHTS["activity"] * calculate_activity_score(activities, destination)
+        + SCORING_WEIGHTS["local_engagement"] * calculate_local_engagement_score(activities)
+    )
+
+
+def day_value(
+    chosen: Sequence[int],
+    utilities: Sequence[float],
+    types: Sequence[ActivityType],
+    interests: Sequence[ActivityType],
+) -> float:
+    """Mean value of a day's activities, the quantity build_day_plan maximises.
+
+    Args:
+        chosen: Indices of the day's activities
+        utilities: Value of each candidate
+        types: Activity type of each candidate
+        interests: Traveler interests
+
+    Returns:
+        (Sum of utilities + INTEREST_BONUS per interest covered) / activity count
+    """
+    if not chosen:
+        return 0.0
+    covered = {types[index] for index in chosen} & set(interests)
+    return (sum(utilities[index] for index in chosen) + INTEREST_BONUS * len(covered)) / len(chosen)
+
+
+def build_day_plan(
+    hours: Sequence[int],
+    utilities: Sequence[float],
+    types: Sequence[ActivityType],
+    interests: Sequence[ActivityType],
+    hour_budget: float = ITINERARY_DAY_HOURS,
+    min_activities: int = ITINERARY_MIN_DAILY_ACTIVITIES,
+    max_activities: int = ITINERARY_MAX_DAILY_ACTIVITIES,
+) -> List[int]:
+    """Choose one day's activities to maximise their mean value.
+
+    The itinerary score averages per-activity contributions, so a day
+    holding only its single best activity would score highest. Days are
+    therefore planned with an explicit minimum: the plan maximises
+    day_value (mean utility, with INTEREST_BONUS per interest covered
+    spread over the day) among plans of min_activities to max_activities
+    activities that fit the hour budget. Fewer than min_activities are
+    planned only when no more fit.
+
+    For each activity count, activities are added greedily, as long as the
+    remaining slots can still be filled, then single swaps that raise the
+    total are applied (at a fixed count, the highest total is the highest
+    mean). Greedy runs once by marginal value and once by marginal value
+    per hour, keeping the better plan. Marginal values are computed
+    incrementally from per-type counts, so the work is
+    O(max_activities x candidates) per pass and count. Ties resolve to the
+    lowest index and the smallest count, so the plan is deterministic.
+
+    Args:
+        hours: Hours each candidate takes, including transit
+        utilities: Value of each candidate (already penalised for repeats)
+        types: Activity type of each candidate
+        interests: Traveler interests
+        hour_budget: Hours available in the day
+        min_activities: Minimum activities in the day (if they fit)
+        max_activities: Maximum activities in the day
+
+    Returns:
+        Indices of the chosen candidates, in the order they were chosen
+    """
+    by_hours = sorted(range(len(hours)), key=hours.__getitem__)
+
+    # Most activities that fit at all: the shortest ones
+    fit, used_hours = 0, 0.0
+    for index in by_hours[:max_activities]:
+        if used_hours + hours[index] > hour_budget:
+            break
+        fit, used_hours = fit + 1, used_hours + hours[index]
+
+    best: List[int] = []
+    best_value = -math.inf
+    for count in range(min(min_activities, fit), fit + 1):
+        for per_hour in (False, True):
+            chosen = _fill_day(hours, utilities, types, interests, hour_budget, count, by_hours, per_hour)
+            value = day_value(chosen, utilities, types, interests)
+            if value > best_value:
+                best, best_value = chosen, value
+    return best
+
+
+def _fill_day(
+    hours: Sequence[int],
+    utilities: Sequence[float],
+    types: Sequence[ActivityType],
+    interests: Sequence[ActivityType],
+    hour_budget: float,
+    count: int,
+    by_hours: Sequence[int],
+    per_hour: bool = False,
+) -> List[int]:
+    """Pick count activities with the highest total value that fit.
+
+    Args:
+        hours: Hours each candidate takes, including transit
+        utilities: Value of each candidate
+        types: Activity type of each candidate
+        interests: Traveler interests
+        hour_budget: Hours available in the day
+        count: Number of activities (at most the number that fit)
+        by_hours: Candidate indices sorted by hours, shortest first
+        per_hour: Rank greedy picks by marginal value per hour instead of
+            marginal value
+
+    Returns:
+        Indices of the chosen candidates, in the order they were chosen
+    """
+    wanted = set(interests)
+    type_counts: Dict[ActivityType, int] = {}
+    chosen: List[int] = []
+    used_hours = 0.0
+
+    def gain(index: int, removed: Optional[int] = None) -> float:
+        """Change in day total from adding index (and removing removed)."""
+        value = utilities[index]
+        activity_type = types[index]
+        if activity_type in wanted:
+            covered = type_counts.get(activity_type, 0)
+            if removed is not None and types[removed] == activity_type:
+                covered -= 1
+            if covered == 0:
+                value += INTEREST_BONUS
+        if removed is not None:
+            value -= utilities[removed]
+            removed_type = types[removed]
+            if removed_type in wanted and removed_type != activity_type and type_counts[removed_type] == 1:
+                value -= INTEREST_BONUS
+        return value
+
+    def completion_hours(slots: int, skip: int) -> float:
+        """Fewest hours that fill slots more activities, not using skip."""
+        total, found = 0.0, 0
+        for index in by_hours:
+            if found == slots:
+                break
+            if index != skip and index not in chosen:
+                total += hours[index]
+                found += 1
+        return total
+
+    # Greedy: best marginal value that still leaves room for the rest
+    while len(chosen) < count:
+        slots = count - len(chosen) - 1
+        best, best_gain = None, -math.inf
+        for index in range(len(utilities)):
+            if index in chosen:
+                continue
+            if used_hours + hours[index] + completion_hours(slots, index) > hour_budget:
+                continue
+            index_gain = gain(index) / hours[index] if per_hour else gain(index)
+            if index_gain > best_gain:
+                best, best_gain = index, index_gain
+        if best is None:
+            break
+        chosen.append(best)
+        used_hours += hours[best]
+        type_counts[types[best]] = type_counts.get(types[best], 0) + 1
+
+    # Local search: swap a chosen activity for a better one that fits
+    for _ in range(SWAP_PASSES):
+        improved = False
+        for position, current in enumerate(chosen):
+            best, best_gain = None, 1e-9
+            for index in range(len(utilities)):
+                if index in chosen:
+                    continue
+                if used_hours - hours[current] + hours[index] > hour_budget:
+                    continue
+                swap_gain = gain(index, removed=current)
+                if swap_gain > best_gain:
+                    best, best_gain = index, swap_gain
+            if best is None:
+                continue
+            chosen[position] = best
+            used_hours += hours[best] - hours[current]
+            type_counts[types[current]] -= 1
+            type_counts[types[best]] = type_counts.get(types[best], 0) + 1
+            improved = True
+        if not improved:
+            break
+
+    return chosen
+
+
+def optimise_activities(
+    catalogue: DestinationCatalogue,
+    destination: str,
+    days: int,
+    interests: Sequence[ActivityType],
+    sustainability_preference: float,
+    option: int = 0,
+) -> List[List[Dict]]:
+    """Plan every day's activities to maximise sustainability and variety.
+
+    Each candidate's utility is its contribution to the itinerary score.
+    Days are planned in order with build_day_plan, and each earlier use of
+    an activity scales its utility by REPEAT_DECAY, so later days favour
+    activities not done yet while long trips still get full days.
+    Alternative options (option > 0) perturb utilities with a seeded
+    jitter to give different, still high-scoring plans; the same arguments
+    always produce the same plan.
+
+    Args:
+        catalogue: Destination's activity catalogue
+        destination: Destination city
+        days: Number of days
+        interests: Traveler interests
+        sustainability_preference: Preference score (0-1)
+        option: Option number (0 is the best plan)
+
+    Returns:
+        Activity dicts for each day
+    """
+    candidates = []
+    for index in range(len(catalogue)):
+        distance = activity_distance(destination, catalogue.names[index])
+        candidates.append(catalogue.activity(
+            index,
+            transport_for(distance, sustainability_preference),
+            distance,
+        ))
+
+    base_utilities = [activity_utility(activity, destination) for activity in candidates]
+    if option:
+        rng = random.Random(option)
+        base_utilities = [
+            utility * (1.0 + rng.uniform(-OPTION_JITTER, OPTION_JITTER))
+            for utility in base_utilities
+        ]
+    hours = [int(activity["duration"]) + TRANSIT_HOURS for activity in candidates]
+    types = [activity["type"] for activity in candidates]
+
+    uses = [0] * len(candidates)
+    plan = []
+    for _ in range(days):
+        utilities = [
+            utility * REPEAT_DECAY ** used
+            for utility, used in zip(base_utilities, uses)
+        ]
+        chosen = build_day_plan(hours, utilities, types, interests)
+        for index in chosen:
+            uses[index] += 1
+        plan.append([dict(candidates[index]) for index in chosen])
+    return plan
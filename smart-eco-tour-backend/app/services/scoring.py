@@ -1,5 +1,6 @@
 """Sustainability scoring engine."""
 from typing import Dict, List, Tuple
+from app.config import SCORING_WEIGHTS
 from app.models.schemas import ScoreBreakdown, ItinerarySustainability, Itinerary
 from app.data.carbon import (
     get_carbon_for_transport,
@@ -340,14 +341,8 @@ def calculate_itinerary_sustainability(
         overtourism_score=overtourism_score,
     )
     
-    # Weighted average (can be customized)
-    weights = {
-        "transport": 0.30,
-        "accommodation": 0.20,
-        "activity": 0.20,
-        "local_engagement": 0.20,
-        "overtourism": 0.10,
-    }
+    # Weighted average (configured in app.config)
+    weights = SCORING_WEIGHTS
     
     total_score = (
         breakdown.transport_score * weights["transport"]
@@ -0,0 +1,1202 @@
+"""Traveler profile storage and vector indexes for group matching."""
+import bisect
+import heapq
+import math
+import threading
+from datetime import date
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import ANN_MIN_INDEX_SIZE, ANN_NUM_LISTS, ANN_NUM_PROBES
+from app.models.schemas import ActivityType, TravelerProfile
+from app.utils.ann import IVFIndex
+from app.utils.similarity import interest_mask
+
+# Upper bounds (in days) of the trip-length buckets used for partitioning
+TRIP_LENGTH_BUCKETS = (3, 7, 14)
+
+# Per-traveler columns of TravelerStore (codes index into interned values)
+_COLUMN_DTYPES = {
+    "seq": np.int64,  # insertion order, used as the listing cursor
+    "destination": np.int32,
+    "trip_days": np.int32,
+    "sustainability_score_min": np.float64,
+    "interests": np.int32,
+    "max_group_size": np.int32,
+    "transport_preference": np.int16,
+    "has_vector": np.bool_,
+    "start_day": np.int32,  # date ordinal, 0 when the traveler has no dates
+    "end_day": np.int32,
+    "vector_norm": np.float32,  # the unit vector itself lives in the destination index
+}
+
+# int8 quantisation step for unit-length profile vector components
+_INT8_SCALE = 127.0
+
+
+def normalize_destination(destination: str) -> str:
+    """Normalise a destination name for index lookups.
+
+    Args:
+        destination: Destination as entered by the traveler
+
+    Returns:
+        Case- and whitespace-insensitive destination key
+    """
+    return " ".join(destination.split()).casefold()
+
+
+def trip_length_bucket(days: int) -> int:
+    """Map a trip length to its partition bucket.
+
+    Args:
+        days: Trip length in days
+
+    Returns:
+        Bucket number (0 = up to 3 days, 1 = up to a week, 2 = up to two
+        weeks, 3 = longer)
+    """
+    for bucket, max_days in enumerate(TRIP_LENGTH_BUCKETS):
+        if days <= max_days:
+            return bucket
+    return len(TRIP_LENGTH_BUCKETS)
+
+
+class TravelerVectorIndex:
+    """Contiguous matrix of unit-normalised traveler profile vectors.
+
+    Rows are kept pre-normalised, so cosine similarity against every
+    traveler in the index is one matrix-vector product. Rows are stored as
+    float32, or as int8 (components scaled by _INT8_SCALE) to quarter the
+    memory at the cost of about 0.004 absolute error per component. Each
+    row also carries a small bucket number (the trip-length bucket in
+    TravelerStore), so searches can be restricted to one bucket without a
+    separate index. With an ANN backend attached, large indexes only
+    re-rank the ANN candidates.
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 64,
+        ann: Optional[IVFIndex] = None,
+        dtype: str = "float32",
+    ):
+        """Create an empty index.
+
+        Args:
+            initial_capacity: Number of rows allocated up front
+            ann: Optional approximate nearest-neighbour backend
+            dtype: Storage type of the rows, float32 or int8
+        """
+        if dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+
+        self._capacity = max(1, initial_capacity)
+        self._dtype = np.int8 if dtype == "int8" else np.float32
+        self._matrix: Optional[np.ndarray] = None
+        self._buckets = np.zeros(self._capacity, dtype=np.int8)
+        self._bucket_sizes: Dict[int, int] = {}
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._ann = ann
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, traveler_id: str) -> bool:
+        return traveler_id in self._rows
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in the index arrays."""
+        matrix = self._matrix
+        size = self._buckets.nbytes
+        if matrix is not None:
+            size += matrix.nbytes
+        return size
+
+    def count(self, bucket: Optional[int] = None) -> int:
+        """Count indexed travelers, optionally in one bucket.
+
+        Args:
+            bucket: Bucket number (None for all)
+
+        Returns:
+            Number of travelers
+        """
+        if bucket is None:
+            return len(self._ids)
+        return self._bucket_sizes.get(bucket, 0)
+
+    def vector(self, traveler_id: str) -> np.ndarray:
+        """Get a traveler's unit vector.
+
+        Args:
+            traveler_id: Traveler id
+
+        Returns:
+            float32 unit vector (decoded if stored as int8)
+        """
+        return self._dense(self._rows[traveler_id])
+
+    def upsert(self, traveler_id: str, vector: List[float], bucket: int = 0) -> None:
+        """Add a traveler or replace their vector.
+
+        Args:
+            traveler_id: Traveler id
+            vector: Profile vector
+            bucket: Bucket number of the traveler
+        """
+        row_vector = _unit(np.asarray(vector, dtype=np.float32))
+
+        if self._matrix is None:
+            self._matrix = np.zeros((self._capacity, row_vector.shape[0]), dtype=self._dtype)
+        elif row_vector.shape[0] != self._matrix.shape[1]:
+            raise ValueError("Vectors must have equal length")
+
+        row = self._rows.get(traveler_id)
+        if row is None:
+            row = len(self._ids)
+            if row == self._capacity:
+                self._grow()
+            self._ids.append(traveler_id)
+            self._rows[traveler_id] = row
+        else:
+            self._bucket_sizes[int(self._buckets[row])] -= 1
+
+        self._matrix[row] = self._encode(row_vector)
+        self._buckets[row] = bucket
+        self._bucket_sizes[bucket] = self._bucket_sizes.get(bucket, 0) + 1
+
+        if self._ann is not None:
+            if self._ann.needs_training(len(self._ids)):
+                self._ann.train(self._dense(slice(0, len(self._ids))))
+            else:
+                self._ann.add(row, row_vector)
+
+    def upsert_many(
+        self,
+        traveler_ids: List[str],
+        vectors: np.ndarray,
+        buckets: Optional[List[int]] = None,
+    ) -> None:
+        """Add or replace many travelers with one block write.
+
+        Args:
+            traveler_ids: Traveler ids (unique)
+            vectors: Profile vectors (one row per id)
+            buckets: Bucket number of each traveler (default all 0)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+        if buckets is None:
+            buckets = [0] * len(traveler_ids)
+
+        # Existing travelers are replaced in place, new ones appended as a block
+        new = [i for i, traveler_id in enumerate(traveler_ids) if traveler_id not in self._rows]
+        is_new = set(new)
+        for i, traveler_id in enumerate(traveler_ids):
+            if i not in is_new:
+                self.upsert(traveler_id, vectors[i], buckets[i])
+        if not new:
+            return
+
+        if self._matrix is None:
+            self._matrix = np.zeros((self._capacity, vectors.shape[1]), dtype=self._dtype)
+        elif vectors.shape[1] != self._matrix.shape[1]:
+            raise ValueError("Vectors must have equal length")
+
+        start = len(self._ids)
+        while start + len(new) > self._capacity:
+            self._grow()
+        self._matrix[start:start + len(new)] = self._encode(vectors[new])
+        for offset, i in enumerate(new):
+            self._ids.append(traveler_ids[i])
+            self._rows[traveler_ids[i]] = start + offset
+            self._buckets[start + offset] = buckets[i]
+            self._bucket_sizes[buckets[i]] = self._bucket_sizes.get(buckets[i], 0) + 1
+
+        if self._ann is not None:
+            if self._ann.needs_training(len(self._ids)):
+                self._ann.train(self._dense(slice(0, len(self._ids))))
+            else:
+                for offset, i in enumerate(new):
+                    self._ann.add(start + offset, vectors[i])
+
+    def remove(self, traveler_id: str) -> None:
+        """Remove a traveler, moving the last row into the freed slot.
+
+        Args:
+            traveler_id: Traveler id
+        """
+        row = self._rows.pop(traveler_id, None)
+        if row is None:
+            return
+        if self._ann is not None:
+            self._ann.remove(row)
+        self._bucket_sizes[int(self._buckets[row])] -= 1
+
+        last = len(self._ids) - 1
+        if row != last:
+            if self._ann is not None:
+                self._ann.move(last, row)
+            moved_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._buckets[row] = self._buckets[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._ids.pop()
+
+    def search(
+        self,
+        vector: List[float],
+        min_similarity: float = 0.0,
+        top_k: Optional[int] = None,
+        exclude: Optional[str] = None,
+        exact: bool = False,
+        candidates: Optional[List[str]] = None,
+        bucket: Optional[int] = None,
+    ) -> Tuple[List[Tuple[str, float]], int]:
+        """Find travelers whose cosine similarity to vector meets a threshold.
+
+        Args:
+            vector: Query profile vector
+            min_similarity: Minimum cosine similarity
+            top_k: Number of best matches to return (None for all)
+            exclude: Traveler id to leave out (usually the query traveler)
+            exact: Scan every row even when an ANN backend is ready
+            candidates: Only score these traveler ids (all in this index)
+            bucket: Only match travelers in this bucket
+
+        Returns:
+            Tuple of (top matches as (traveler_id, similarity) sorted by
+            similarity descending, total number of matches). With the ANN
+            backend the total only counts matches among its candidates.
+        """
+        n = len(self._ids)
+        if n == 0:
+            return [], 0
+
+        query = _unit(np.asarray(vector, dtype=np.float32))
+
+        if candidates is not None:
+            rows = np.fromiter(map(self._rows.__getitem__, candidates), dtype=np.intp)
+            similarities = self._dense(rows) @ query
+        elif self._ann is not None and self._ann.ready and not exact:
+            rows = self._ann.candidates(query)
+            similarities = self._dense(rows) @ query
+        else:
+            rows = None
+            similarities = self._dense(slice(0, n)) @ query
+
+        mask = similarities >= min_similarity
+        if bucket is not None:
+            # One scan over the whole index beats copying out a bucket's rows
+            mask &= (self._buckets[:n] if rows is None else self._buckets[rows]) == bucket
+        if exclude is not None and exclude in self._rows:
+            if rows is None:
+                mask[self._rows[exclude]] = False
+            else:
+                mask &= rows != self._rows[exclude]
+
+        candidates = np.flatnonzero(mask)
+        total = len(candidates)
+
+        if top_k is not None and total > top_k:
+            # Partial sort: only the top_k candidates get fully ordered
+            best = np.argpartition(-similarities[candidates], top_k - 1)[:top_k]
+            candidates = candidates[best]
+        order = candidates[np.argsort(-similarities[candidates], kind="stable")]
+
+        order_rows = order if rows is None else rows[order]
+        return [
+            (self._ids[row], float(similarities[pos]))
+            for row, pos in zip(order_rows, order)
+        ], total
+
+    def snapshot(self) -> Tuple[List[str], np.ndarray]:
+        """Copy the indexed ids and their unit vectors.
+
+        Returns:
+            Tuple of (traveler ids, float32 matrix with one row per id)
+        """
+        n = len(self._ids)
+        if n == 0:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        return list(self._ids), np.array(self._dense(slice(0, n)))
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Convert unit vectors to the storage type."""
+        if self._dtype is np.int8:
+            return np.round(np.clip(vectors, -1.0, 1.0) * _INT8_SCALE)
+        return vectors
+
+    def _dense(self, rows) -> np.ndarray:
+        """Get rows as float32 unit vectors (a view when stored as float32)."""
+        matrix = self._matrix[rows]
+        if self._dtype is np.int8:
+            return matrix.astype(np.float32) / _INT8_SCALE
+        return matrix
+
+    def _grow(self) -> None:
+        """Double the allocated capacity."""
+        self._capacity *= 2
+        n = len(self._ids)
+        matrix = np.zeros((self._capacity, self._matrix.shape[1]), dtype=self._dtype)
+        matrix[:n] = self._matrix[:n]
+        self._matrix = matrix
+        buckets = np.zeros(self._capacity, dtype=np.int8)
+        buckets[:n] = self._buckets[:n]
+        self._buckets = buckets
+
+
+class NeighbourGraph(TravelerVectorIndex):
+    """Vector index that also keeps every traveler's top-k neighbours.
+
+    Neighbour lists are maintained at write time: adding a traveler links
+    it into the lists of the travelers it beats, and removing one only
+    recomputes the lists that pointed at it. Reads are then a dict lookup.
+    Neighbours are found across all buckets.
+    """
+
+    def __init__(
+        self,
+        k: int = 20,
+        initial_capacity: int = 64,
+        ann: Optional[IVFIndex] = None,
+        dtype: str = "float32",
+    ):
+        """Create an empty graph.
+
+        Args:
+            k: Number of neighbours kept per traveler
+            initial_capacity: Number of rows allocated up front
+            ann: Optional approximate nearest-neighbour backend (used by
+                search() only; neighbour lists are always exact)
+            dtype: Storage type of the rows, float32 or int8
+        """
+        super().__init__(initial_capacity, ann=ann, dtype=dtype)
+        self.k = k
+        # Similarity of each row's k-th neighbour (-inf while its list is short)
+        self._kth = np.full(self._capacity, -np.inf, dtype=np.float32)
+        self._neighbours: Dict[str, List[Tuple[str, float]]] = {}
+        self._reverse: Dict[str, Set[str]] = {}
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in the index arrays."""
+        return super().nbytes + self._kth.nbytes
+
+    def neighbours(self, traveler_id: str) -> Optional[List[Tuple[str, float]]]:
+        """Get a traveler's cached neighbours.
+
+        Args:
+            traveler_id: Traveler id
+
+        Returns:
+            Up to k (traveler_id, similarity) pairs sorted by similarity
+            descending, or None if the traveler is not in the graph
+        """
+        neighbours = self._neighbours.get(traveler_id)
+        return None if neighbours is None else list(neighbours)
+
+    def upsert(self, traveler_id: str, vector: List[float], bucket: int = 0) -> None:
+        """Add a traveler or replace their vector, updating affected lists.
+
+        Args:
+            traveler_id: Traveler id
+            vector: Profile vector
+            bucket: Bucket number of the traveler
+        """
+        self.remove(traveler_id)
+
+        row_vector = _unit(np.asarray(vector, dtype=np.float32))
+        neighbours: List[Tuple[str, float]] = []
+        n = len(self._ids)
+        if n:
+            similarities = self._dense(slice(0, n)) @ row_vector
+
+            # Only travelers whose k-th neighbour is worse than the newcomer change
+            for row in np.flatnonzero(similarities > self._kth[:n]):
+                self._link(self._ids[row], traveler_id, float(similarities[row]))
+
+            nearest = np.arange(n)
+            if n > self.k:
+                nearest = np.argpartition(-similarities, self.k - 1)[:self.k]
+            nearest = nearest[np.argsort(-similarities[nearest], kind="stable")]
+            neighbours = [(self._ids[row], float(similarities[row])) for row in nearest]
+
+        super().upsert(traveler_id, row_vector, bucket)
+        self._set_neighbours(traveler_id, neighbours)
+
+    def upsert_many(
+        self,
+        traveler_ids: List[str],
+        vectors: np.ndarray,
+        buckets: Optional[List[int]] = None,
+    ) -> None:
+        """Add or replace many travelers, updating the graph chunk by chunk.
+
+        Each chunk costs one matrix product against the whole graph, and
+        every existing list is merged with its new neighbours at most once.
+
+        Args:
+            traveler_ids: Traveler ids (unique)
+            vectors: Profile vectors (one row per id)
+            buckets: Bucket number of each traveler (default all 0)
+        """
+        for traveler_id in traveler_ids:
+            self.remove(traveler_id)
+        if buckets is None:
+            buckets = [0] * len(traveler_ids)
+
+        # Bound the similarity block to about 16M entries
+        chunk = max(1, min(256, (1 << 24) // max(len(self._ids) + len(traveler_ids), 1)))
+        for start in range(0, len(traveler_ids), chunk):
+            self._insert_chunk(
+                traveler_ids[start:start + chunk],
+                vectors[start:start + chunk],
+                buckets[start:start + chunk],
+            )
+
+    def remove(self, traveler_id: str) -> None:
+        """Remove a traveler and repair the lists that contained it.
+
+        Args:
+            traveler_id: Traveler id
+        """
+        if traveler_id not in self._rows:
+            return
+
+        self._set_neighbours(traveler_id, [])
+        del self._neighbours[traveler_id]
+        affected = self._reverse.pop(traveler_id, set())
+
+        # Mirror the swap-remove done by the base class
+        row, last = self._rows[traveler_id], len(self._ids) - 1
+        self._kth[row] = self._kth[last]
+        self._kth[last] = -np.inf
+        super().remove(traveler_id)
+
+        for owner in affected:
+            self._neighbours[owner] = [
+                match for match in self._neighbours[owner] if match[0] != traveler_id
+            ]
+            matches, _ = self.search(
+                self.vector(owner), min_similarity=-1.0, top_k=self.k, exclude=owner, exact=True
+            )
+            self._set_neighbours(owner, matches)
+
+    def _insert_chunk(self, traveler_ids: List[str], vectors: np.ndarray, buckets: List[int]) -> None:
+        """Append new travelers and link them into the graph together."""
+        old = len(self._ids)
+        TravelerVectorIndex.upsert_many(self, traveler_ids, vectors, buckets)
+        n = len(self._ids)
+        similarities = self._dense(slice(0, n)) @ self._dense(slice(old, n)).T
+
+        # Existing travelers: merge in the newcomers that beat their k-th neighbour
+        better = similarities[:old] > self._kth[:old, None]
+        for row in np.flatnonzero(better.any(axis=1)):
+            columns = np.flatnonzero(better[row])
+            additions = sorted(
+                ((traveler_ids[column], float(similarities[row, column])) for column in columns),
+                key=lambda match: -match[1],
+            )
+            owner = self._ids[row]
+            merged = heapq.merge(self._neighbours[owner], additions, key=lambda match: -match[1])
+            self._set_neighbours(owner, list(islice(merged, self.k)))
+
+        # Newcomers: top-k over everyone, including the rest of the chunk
+        for column, traveler_id in enumerate(traveler_ids):
+            scores = similarities[:, column].copy()
+            scores[old + column] = -np.inf
+            nearest = np.arange(n)
+            if n - 1 > self.k:
+                nearest = np.argpartition(-scores, self.k - 1)[:self.k]
+            nearest = nearest[np.argsort(-scores[nearest], kind="stable")]
+            self._set_neighbours(traveler_id, [
+                (self._ids[row], float(scores[row]))
+                for row in nearest
+                if row != old + column
+            ])
+
+    def _link(self, owner: str, other: str, similarity: float) -> None:
+        """Insert other into owner's list, evicting the k-th neighbour if full."""
+        neighbours = self._neighbours[owner]
+        position = len(neighbours)
+        while position and neighbours[position - 1][1] < similarity:
+            position -= 1
+        neighbours.insert(position, (other, similarity))
+        self._reverse.setdefault(other, set()).add(owner)
+        if len(neighbours) > self.k:
+            dropped, _ = neighbours.pop()
+            self._reverse[dropped].discard(owner)
+        self._update_kth(owner)
+
+    def _set_neighbours(self, owner: str, neighbours: List[Tuple[str, float]]) -> None:
+        """Replace owner's list, keeping the reverse edges in sync."""
+        for other, _ in self._neighbours.get(owner, []):
+            self._reverse[other].discard(owner)
+        self._neighbours[owner] = neighbours
+        for other, _ in neighbours:
+            self._reverse.setdefault(other, set()).add(owner)
+        self._update_kth(owner)
+
+    def _update_kth(self, owner: str) -> None:
+        """Refresh the cached k-th neighbour similarity of owner."""
+        neighbours = self._neighbours[owner]
+        kth = neighbours[-1][1] if len(neighbours) >= self.k else -np.inf
+        self._kth[self._rows[owner]] = kth
+
+    def _grow(self) -> None:
+        """Double the allocated capacity."""
+        super()._grow()
+        kth = np.full(self._capacity, -np.inf, dtype=np.float32)
+        kth[:len(self._kth)] = self._kth
+        self._kth = kth
+
+
+class TripDateIndex:
+    """Trip date intervals of one destination's travelers.
+
+    Intervals are kept sorted by start day. Since no trip is longer than
+    the longest one seen, trips overlapping [start, end] all begin in
+    [start - longest, end], which is found by binary search; only that
+    window is checked for end >= start. Travelers without dates are
+    flexible and overlap everything.
+    """
+
+    def __init__(self):
+        self._intervals: List[Tuple[int, int, str]] = []
+        self._interval_of: Dict[str, Tuple[int, int, str]] = {}
+        self._dateless: Set[str] = set()
+        self._longest = 0
+
+    def __len__(self) -> int:
+        return len(self._intervals) + len(self._dateless)
+
+    def add(self, traveler_id: str, start: Optional[int] = None, end: Optional[int] = None) -> None:
+        """Add or replace a traveler's trip.
+
+        Args:
+            traveler_id: Traveler id
+            start: First trip day as a date ordinal (None for no dates)
+            end: Last trip day as a date ordinal
+        """
+        self.remove(traveler_id)
+        if start is None:
+            self._dateless.add(traveler_id)
+            return
+
+        interval = (start, end, traveler_id)
+        bisect.insort(self._intervals, interval)
+        self._interval_of[traveler_id] = interval
+        self._longest = max(self._longest, end - start)
+
+    def remove(self, traveler_id: str) -> None:
+        """Remove a traveler's trip.
+
+        Args:
+            traveler_id: Traveler id
+        """
+        self._dateless.discard(traveler_id)
+        interval = self._interval_of.pop(traveler_id, None)
+        if interval is not None:
+            del self._intervals[bisect.bisect_left(self._intervals, interval)]
+
+    def overlapping(self, start: int, end: int) -> List[str]:
+        """Get the travelers whose trips overlap a date range.
+
+        Args:
+            start: First day as a date ordinal
+            end: Last day as a date ordinal
+
+        Returns:
+            Ids of overlapping and dateless travelers
+        """
+        lo = bisect.bisect_left(self._intervals, (start - self._longest,))
+        hi = bisect.bisect_right(self._intervals, (end, math.inf))
+        overlapping = [
+            traveler_id
+            for _, trip_end, traveler_id in self._intervals[lo:hi]
+            if trip_end >= start
+        ]
+        overlapping.extend(self._dateless)
+        return overlapping
+
+
+class _Interner:
+    """Maps repeated values to small integer codes."""
+
+    def __init__(self):
+        self.values: List = []
+        self._codes: Dict = {}
+
+    def code(self, value) -> int:
+        """Get the code of a value, assigning the next one if it is new."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class TravelerStore:
+    """In-memory traveler database indexed by destination and trip length.
+
+    Behaves like a read-only dict of traveler id to TravelerProfile, but
+    profiles are kept column-wise: NumPy arrays for the numeric fields and
+    small integer codes for repeated values such as destinations and
+    interest lists. TravelerProfile models are only built when a profile
+    is read.
+
+    Each normalised destination has one vector index (a NeighbourGraph
+    when neighbour lists are enabled) holding its travelers' unit vectors,
+    tagged with their trip-length bucket. That index is the only copy of
+    the vectors: profiles are rebuilt from it and a per-row norm, so
+    candidate retrieval only touches travelers going to the destinations
+    being searched and each vector is stored once.
+
+    The store itself is not thread-safe: code running it off the event
+    loop goes through locked(), so writes and reads never interleave.
+    stats() is the exception and may be read without the lock.
+    """
+
+    def __init__(
+        self,
+        ann_enabled: bool = False,
+        neighbours_k: int = 0,
+        vector_dtype: str = "float32",
+        initial_capacity: int = 64,
+    ):
+        """Create an empty store.
+
+        Args:
+            ann_enabled: Attach an approximate nearest-neighbour backend to
+                each destination index (used once it reaches ANN_MIN_INDEX_SIZE)
+            neighbours_k: Size of the cached per-traveler neighbour lists
+                kept for each destination (0 disables the graph)
+            vector_dtype: Storage type of profile vectors in the indexes,
+                float32 or int8 (quantised, about 0.004 absolute error per
+                component and 0.01 in similarities)
+            initial_capacity: Number of rows allocated up front
+        """
+        if vector_dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported vector dtype: {vector_dtype}")
+
+        self.ann_enabled = ann_enabled
+        self.neighbours_k = neighbours_k
+        self.vector_dtype = vector_dtype
+        self._indexes: Dict[str, TravelerVectorIndex] = {}
+        # Destination key and trip-length bucket of each indexed traveler
+        self._partition_of: Dict[str, Tuple[str, int]] = {}
+        self._dimension: Optional[int] = None
+        self._date_indexes: Dict[str, TripDateIndex] = {}
+
+        # Row-aligned columns
+        self._capacity = max(1, initial_capacity)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._columns = {
+            name: np.zeros(self._capacity, dtype=dtype)
+            for name, dtype in _COLUMN_DTYPES.items()
+        }
+        self._next_seq = 1
+        # Seqs in increasing order with their ids, for paging. Entries of
+        # removed or updated travelers stay until the next compaction and
+        # are recognised by their seq no longer matching the row's.
+        self._order_seqs: List[int] = []
+        self._order_ids: List[str] = []
+
+        self._destinations = _Interner()
+        self._interests = _Interner()
+        self._interest_masks: List[int] = []
+        self._transports = _Interner()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, traveler_id: str) -> bool:
+        return traveler_id in self._rows
+
+    def __getitem__(self, traveler_id: str) -> TravelerProfile:
+        return self._materialise(self._rows[traveler_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._ids))
+
+    def get(self, traveler_id: str) -> Optional[TravelerProfile]:
+        """Get a profile by id, or None."""
+        row = self._rows.get(traveler_id)
+        return None if row is None else self._materialise(row)
+
+    def values(self) -> Iterator[TravelerProfile]:
+        """Iterate over all profiles."""
+        for row in range(len(self._ids)):
+            yield self._materialise(row)
+
+    def items(self) -> Iterator[Tuple[str, TravelerProfile]]:
+        """Iterate over (traveler_id, profile) pairs."""
+        for row in range(len(self._ids)):
+            yield self._ids[row], self._materialise(row)
+
+    def locked(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a function while holding the store lock.
+
+        Args:
+            func: Function reading or writing the store
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+        """
+        with self._lock:
+            return func(*args, **kwargs)
+
+    def add(self, profile: TravelerProfile) -> None:
+        """Add or replace a traveler and update their destination index.
+
+        Args:
+            profile: Traveler profile (with profile_vector set)
+        """
+        self._check_dimension([profile])
+        self.remove(profile.id)
+        self._append_row(profile)
+        self._index_dates(profile)
+
+        if profile.profile_vector:
+            destination_key = normalize_destination(profile.destination)
+            bucket = trip_length_bucket(profile.trip_days)
+            index = self._indexes.get(destination_key)
+            if index is None:
+                index = self._indexes[destination_key] = self._new_index()
+            index.upsert(profile.id, profile.profile_vector, bucket)
+            self._partition_of[profile.id] = (destination_key, bucket)
+
+    def add_many(self, profiles: List[TravelerProfile]) -> None:
+        """Add or replace many travelers, updating each destination index once.
+
+        Args:
+            profiles: Traveler profiles (with profile_vector set); if an id
+                appears more than once the last profile wins
+        """
+        latest = {profile.id: profile for profile in profiles}
+        self._check_dimension(latest.values())
+        for traveler_id in latest:
+            self.remove(traveler_id)
+
+        batches: Dict[str, List[TravelerProfile]] = {}
+        for profile in latest.values():
+            self._append_row(profile)
+            self._index_dates(profile)
+            if profile.profile_vector:
+                batches.setdefault(normalize_destination(profile.destination), []).append(profile)
+
+        for destination_key, batch in batches.items():
+            ids = [profile.id for profile in batch]
+            vectors = np.array([profile.profile_vector for profile in batch], dtype=np.float32)
+            buckets = [trip_length_bucket(profile.trip_days) for profile in batch]
+
+            index = self._indexes.get(destination_key)
+            if index is None:
+                index = self._indexes[destination_key] = self._new_index()
+            index.upsert_many(ids, vectors, buckets)
+            for traveler_id, bucket in zip(ids, buckets):
+                self._partition_of[traveler_id] = (destination_key, bucket)
+
+    def remove(self, traveler_id: str) -> None:
+        """Remove a traveler from the store and its destination index.
+
+        Args:
+            traveler_id: Traveler id
+        """
+        row = self._rows.get(traveler_id)
+        if row is not None:
+            destination_key = normalize_destination(
+                self._destinations.values[self._columns["destination"][row]]
+            )
+            dates = self._date_indexes.get(destination_key)
+            if dates is not None:
+                dates.remove(traveler_id)
+                if not len(dates):
+                    del self._date_indexes[destination_key]
+
+        self._remove_row(traveler_id)
+        key = self._partition_of.pop(traveler_id, None)
+        if key is None:
+            return
+
+        index = self._indexes[key[0]]
+        index.remove(traveler_id)
+        if not len(index):
+            del self._indexes[key[0]]
+
+    def page(
+        self,
+        cursor: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[TravelerProfile], Optional[int]]:
+        """Get profiles in insertion order, starting after a cursor.
+
+        Updating a profile moves it to the end of the order.
+
+        Args:
+            cursor: Cursor returned by the previous page (0 for the start)
+            limit: Maximum number of profiles (None for all)
+
+        Returns:
+            Tuple of (profiles, cursor for the next page or None if this
+            was the last page)
+        """
+        seqs = self._columns["seq"]
+        rows: List[int] = []
+        next_cursor = None
+        # Only the page itself (plus any stale entries in it) is visited
+        for position in range(bisect.bisect_right(self._order_seqs, cursor), len(self._order_seqs)):
+            row = self._rows.get(self._order_ids[position])
+            if row is None or seqs[row] != self._order_seqs[position]:
+                continue
+            if limit is not None and len(rows) == limit:
+                next_cursor = int(seqs[rows[-1]])
+                break
+            rows.append(row)
+        return [self._materialise(row) for row in rows], next_cursor
+
+    def max_group_sizes(self, traveler_ids: Iterable[str]) -> np.ndarray:
+        """Get the max_group_size column for some travelers.
+
+        Args:
+            traveler_ids: Traveler ids
+
+        Returns:
+            Array of maximum group sizes, in the same order
+        """
+        rows = np.fromiter(map(self._rows.__getitem__, traveler_ids), dtype=np.intp)
+        return self._columns["max_group_size"][rows]
+
+    def interest_mask(self, traveler_id: str) -> int:
+        """Get a traveler's interest bitmask without building the profile.
+
+        Args:
+            traveler_id: Traveler id
+
+        Returns:
+            Interest bitmask
+        """
+        return self._interest_masks[self._columns["interests"][self._rows[traveler_id]]]
+
+    def interests(self, traveler_id: str) -> List[ActivityType]:
+        """Get a traveler's interests without building the profile.
+
+        Args:
+            traveler_id: Traveler id
+
+        Returns:
+            Interests in the order they were given
+        """
+        return list(self._interests.values[self._columns["interests"][self._rows[traveler_id]]])
+
+    def stats(self) -> Dict[str, int]:
+        """Get store size statistics.
+
+        Safe to call without the lock (e.g. from the event loop while a
+        write runs on the executor): it only reads counters and array
+        sizes, so the figures may lag a concurrent write but never block.
+
+        Returns:
+            Dict with the traveler count and bytes held in array columns
+            and in the vector indexes (neighbour lists not included)
+        """
+        # Copy the dict views first; a concurrent write may add an index
+        column_bytes = sum(column.nbytes for column in list(self._columns.values()))
+        index_bytes = sum(index.nbytes for index in list(self._indexes.values()))
+        return {
+            "travelers": len(self._ids),
+            "column_bytes": column_bytes,
+            "index_bytes": index_bytes,
+            "total_bytes": column_bytes + index_bytes,
+            "vector_dtype": self.vector_dtype,
+        }
+
+    def count(self, destinations: Iterable[str], trip_days: Optional[int] = None) -> int:
+        """Count indexed travelers going to any of the destinations.
+
+        Args:
+            destinations: Destination names
+            trip_days: Only count travelers in this trip length's bucket
+
+        Returns:
+            Number of travelers
+        """
+        bucket = None if trip_days is None else trip_length_bucket(trip_days)
+        return sum(index.count(bucket) for index in self._select_indexes(destinations))
+
+    def search(
+        self,
+        vector: List[float],
+        destinations: Iterable[str],
+        min_similarity: float = 0.0,
+        top_k: Optional[int] = None,
+        exclude: Optional[str] = None,
+        trip_days: Optional[int] = None,
+        date_range: Optional[Tuple[date, date]] = None,
+    ) -> Tuple[List[Tuple[str, float]], int]:
+        """Find similar travelers going to any of the destinations.
+
+        Args:
+            vector: Query profile vector
+            destinations: Destination names to search within
+            min_similarity: Minimum cosine similarity
+            top_k: Number of best matches to return (None for all)
+            exclude: Traveler id to leave out
+            trip_days: Only search travelers in this trip length's bucket
+            date_range: Only search travelers whose trip overlaps these
+                dates (travelers without dates always qualify)
+
+        Returns:
+            Tuple of (top matches as (traveler_id, similarity) sorted by
+            similarity descending, total number of matches)
+        """
+        bucket = None if trip_days is None else trip_length_bucket(trip_days)
+        if date_range is None:
+            searches = [(index, None) for index in self._select_indexes(destinations)]
+        else:
+            searches = self._overlapping_candidates(destinations, trip_days, date_range)
+
+        results = []
+        total = 0
+        for index, candidates in searches:
+            matches, found = index.search(
+                vector, min_similarity, top_k, exclude, candidates=candidates, bucket=bucket
+            )
+            results.append(matches)
+            total += found
+
+        # Each destination's matches are already sorted, so merge them lazily
+        merged = heapq.merge(*results, key=lambda match: -match[1])
+        return list(islice(merged, top_k)), total
+
+    def snapshot(self, destination: str) -> Tuple[List[str], np.ndarray]:
+        """Copy the ids and unit vectors of every traveler going to a destination.
+
+        Args:
+            destination: Destination name
+
+        Returns:
+            Tuple of (traveler ids, matrix with one row per id)
+        """
+        index = self._indexes.get(normalize_destination(destination))
+        if index is None:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        return index.snapshot()
+
+    def cached_matches(
+        self,
+        traveler_id: str,
+        min_similarity: float = 0.0,
+        date_range: Optional[Tuple[date, date]] = None,
+    ) -> Optional[Tuple[List[Tuple[str, float]], int]]:
+        """Answer a same-destination search from the neighbour graph.
+
+        Args:
+            traveler_id: Reference traveler id
+            min_similarity: Minimum cosine similarity
+            date_range: Only keep travelers whose trip overlaps these dates
+
+        Returns:
+            Tuple of (matches sorted by similarity descending, total number
+            of matches), or None when the graph cannot answer exactly (graph
+            disabled, or all k cached neighbours pass the threshold so more
+            matches may exist) and search() should be used instead
+        """
+        key = self._partition_of.get(traveler_id)
+        if key is None or not self.neighbours_k:
+            return None
+
+        neighbours = self._indexes[key[0]].neighbours(traveler_id)
+        matches = [match for match in neighbours if match[1] >= min_similarity]
+        if len(matches) == self.neighbours_k:
+            return None
+
+        # The list holds every match, so filtering it by date stays exact
+        if date_range is not None:
+            start, end = date_range[0].toordinal(), date_range[1].toordinal()
+            starts, ends = self._columns["start_day"], self._columns["end_day"]
+            matches = [
+                match for match in matches
+                if starts[self._rows[match[0]]] == 0
+                or (starts[self._rows[match[0]]] <= end and ends[self._rows[match[0]]] >= start)
+            ]
+        return matches, len(matches)
+
+    def _overlapping_candidates(
+        self,
+        destinations: Iterable[str],
+        trip_days: Optional[int],
+        date_range: Tuple[date, date],
+    ) -> List[Tuple[TravelerVectorIndex, List[str]]]:
+        """Get each destination index with its travelers whose trips overlap."""
+        bucket = None if trip_days is None else trip_length_bucket(trip_days)
+        start, end = date_range[0].toordinal(), date_range[1].toordinal()
+
+        searches = []
+        for destination_key in {normalize_destination(d) for d in destinations}:
+            dates = self._date_indexes.get(destination_key)
+            if dates is None:
+                continue
+            candidates = []
+            for traveler_id in dates.overlapping(start, end):
+                key = self._partition_of.get(traveler_id)
+                if key is not None and (bucket is None or key[1] == bucket):
+                    candidates.append(traveler_id)
+            if candidates:
+                searches.append((self._indexes[destination_key], candidates))
+        return searches
+
+    def _index_dates(self, profile: TravelerProfile) -> None:
+        """Record a profile's trip dates in its destination's date index."""
+        destination_key = normalize_destination(profile.destination)
+        dates = self._date_indexes.get(destination_key)
+        if dates is None:
+            dates = self._date_indexes[destination_key] = TripDateIndex()
+        if profile.start_date:
+            dates.add(profile.id, profile.start_date.toordinal(), profile.end_date.toordinal())
+        else:
+            dates.add(profile.id)
+
+    def _append_row(self, profile: TravelerProfile) -> None:
+        """Write a profile into a new row of the columns."""
+        row = len(self._ids)
+        if row == self._capacity:
+            self._grow()
+
+        interests_code = self._interests.code(tuple(profile.interests))
+        if interests_code == len(self._interest_masks):
+            self._interest_masks.append(interest_mask(profile.interests))
+
+        columns = self._columns
+        columns["seq"][row] = self._next_seq
+        self._order_seqs.append(self._next_seq)
+        self._order_ids.append(profile.id)
+        self._next_seq += 1
+        columns["destination"][row] = self._destinations.code(profile.destination)
+        columns["trip_days"][row] = profile.trip_days
+        columns["sustainability_score_min"][row] = profile.sustainability_score_min
+        columns["interests"][row] = interests_code
+        columns["max_group_size"][row] = profile.max_group_size
+        columns["transport_preference"][row] = self._transports.code(profile.transport_preference)
+        columns["has_vector"][row] = bool(profile.profile_vector)
+        columns["start_day"][row] = profile.start_date.toordinal() if profile.start_date else 0
+        columns["end_day"][row] = profile.end_date.toordinal() if profile.end_date else 0
+        columns["vector_norm"][row] = (
+            np.linalg.norm(np.asarray(profile.profile_vector, dtype=np.float32))
+            if profile.profile_vector else 0.0
+        )
+
+        self._ids.append(profile.id)
+        self._names.append(profile.name)
+        self._rows[profile.id] = row
+
+    def _remove_row(self, traveler_id: str) -> None:
+        """Drop a traveler's row, moving the last row into the freed slot."""
+        row = self._rows.pop(traveler_id, None)
+        if row is None:
+            return
+
+        last = len(self._ids) - 1
+        if row != last:
+            for column in self._columns.values():
+                column[row] = column[last]
+            moved_id = self._ids[last]
+            self._ids[row] = moved_id
+            self._names[row] = self._names[last]
+            self._rows[moved_id] = row
+        self._ids.pop()
+        self._names.pop()
+
+        # Drop stale paging entries once they outnumber live ones
+        if len(self._order_seqs) > 2 * len(self._ids) + 64:
+            seqs = self._columns["seq"]
+            live = [
+                (seq, order_id)
+                for seq, order_id in zip(self._order_seqs, self._order_ids)
+                if order_id in self._rows and seqs[self._rows[order_id]] == seq
+            ]
+            self._order_seqs = [seq for seq, _ in live]
+            self._order_ids = [order_id for _, order_id in live]
+
+    def _materialise(self, row: int) -> TravelerProfile:
+        """Build the TravelerProfile model for a row."""
+        columns = self._columns
+        vector = None
+        if columns["has_vector"][row]:
+            traveler_id = self._ids[row]
+            unit = self._indexes[self._partition_of[traveler_id][0]].vector(traveler_id)
+            vector = (unit.astype(np.float64) * float(columns["vector_norm"][row])).tolist()
+
+        interests_code = columns["interests"][row]
+        start_day, end_day = int(columns["start_day"][row]), int(columns["end_day"][row])
+        # Values were validated on the way in, so skip validation here
+        return TravelerProfile.model_construct(
+            id=self._ids[row],
+            name=self._names[row],
+            destination=self._destinations.values[columns["destination"][row]],
+            trip_days=int(columns["trip_days"][row]),
+            sustainability_score_min=float(columns["sustainability_score_min"][row]),
+            interests=list(self._interests.values[interests_code]),
+            max_group_size=int(columns["max_group_size"][row]),
+            transport_preference=self._transports.values[columns["transport_preference"][row]],
+            profile_vector=vector,
+            interest_mask=self._interest_masks[interests_code],
+            start_date=date.fromordinal(start_day) if start_day else None,
+            end_date=date.fromordinal(end_day) if end_day else None,
+        )
+
+    def _grow(self) -> None:
+        """Double the allocated capacity of every column."""
+        self._capacity *= 2
+        n = len(self._ids)
+        for name, column in self._columns.items():
+            grown = np.zeros(self._capacity, dtype=column.dtype)
+            grown[:n] = column[:n]
+            self._columns[name] = grown
+
+    def _check_dimension(self, profiles: Iterable[TravelerProfile]) -> None:
+        """Reject profile vectors whose length differs from the stored ones."""
+        for profile in profiles:
+            if not profile.profile_vector:
+                continue
+            if self._dimension is None:
+                self._dimension = len(profile.profile_vector)
+            elif len(profile.profile_vector) != self._dimension:
+                raise ValueError("Vectors must have equal length")
+
+    def _new_index(self) -> TravelerVectorIndex:
+        """Create the vector index for a new destination."""
+        ann = None
+        if self.ann_enabled:
+            ann = IVFIndex(
+                n_lists=ANN_NUM_LISTS,
+                n_probe=ANN_NUM_PROBES,
+                min_size=ANN_MIN_INDEX_SIZE,
+            )
+        if self.neighbours_k:
+            return NeighbourGraph(self.neighbours_k, ann=ann, dtype=self.vector_dtype)
+        return TravelerVectorIndex(ann=ann, dtype=self.vector_dtype)
+
+    def _select_indexes(self, destinations: Iterable[str]) -> List[TravelerVectorIndex]:
+        """Get the vector indexes of the destinations."""
+        keys = {normalize_destination(d) for d in destinations}
+        return [self._indexes[key] for key in keys if key in self._indexes]
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    """Scale a vector to unit length (zero vectors are left as-is)."""
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
@@ -0,0 +1,201 @@
+"""Approximate nearest-neighbour index for traveler profile vectors."""
+import math
+from typing import List, Optional
+
+import numpy as np
+
+
+class IVFIndex:
+    """Inverted-file (cluster-partitioned) index over unit vectors.
+
+    Vectors are assigned to their nearest of ``n_lists`` spherical k-means
+    centroids. A query only looks at the members of the ``n_probe`` lists
+    whose centroids are closest to it, so raising ``n_probe`` trades
+    latency for recall. Inserts and deletes are incremental; centroids are
+    retrained when the indexed set has grown by ``retrain_factor`` since
+    the last training.
+
+    Vectors are identified by their row in the owning matrix, and each
+    list is a contiguous array of rows, so a query's candidates are a few
+    array slices that index the matrix directly. The owner reports rows
+    moved by its deletes through move().
+    """
+
+    def __init__(
+        self,
+        n_lists: int = 0,
+        n_probe: int = 4,
+        min_size: int = 10000,
+        retrain_factor: float = 4.0,
+        seed: int = 0,
+    ):
+        """Create an untrained index.
+
+        Args:
+            n_lists: Number of clusters (0 picks sqrt of the indexed size)
+            n_probe: Number of clusters searched per query
+            min_size: Number of vectors needed before the index is used
+            retrain_factor: Growth since last training that triggers retraining
+            seed: Random seed for centroid initialisation
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_size = min_size
+        self.retrain_factor = retrain_factor
+        self._rng = np.random.default_rng(seed)
+        self._centroids: Optional[np.ndarray] = None
+        # Rows of each list (first _list_sizes[list] entries are live)
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.intp)
+        # List and position within it of each row (-1 when not indexed)
+        self._list_of = np.zeros(0, dtype=np.intp)
+        self._position_of = np.zeros(0, dtype=np.intp)
+        self._trained_size = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index is trained and can answer queries."""
+        return self._centroids is not None
+
+    def needs_training(self, size: int) -> bool:
+        """Whether the index should be (re)trained for a given number of vectors.
+
+        Args:
+            size: Number of vectors currently indexed
+
+        Returns:
+            True if train() should be called
+        """
+        if size < self.min_size:
+            return False
+        return not self.ready or size >= self._trained_size * self.retrain_factor
+
+    def train(self, vectors: np.ndarray, iterations: int = 10) -> None:
+        """Fit centroids on the vectors and assign every row to a list.
+
+        Args:
+            vectors: Matrix of unit vectors (row i is indexed as row i)
+            iterations: Number of k-means iterations
+        """
+        n = len(vectors)
+        n_lists = self.n_lists or min(4096, max(16, int(math.sqrt(n))))
+        n_lists = min(n_lists, n)
+
+        # Train on a sample so the cost stays bounded for large sets
+        sample_size = min(n, n_lists * 64)
+        sample = vectors[self._rng.choice(n, sample_size, replace=False)]
+        centroids = sample[self._rng.choice(sample_size, n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for list_id in range(n_lists):
+                members = sample[assignment == list_id]
+                if len(members):
+                    centroids[list_id] = members.sum(axis=0)
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.where(norms > 0, norms, 1.0)
+        self._centroids = centroids.astype(np.float32)
+
+        assignment = np.concatenate([
+            np.argmax(vectors[start:start + 65536] @ self._centroids.T, axis=1)
+            for start in range(0, n, 65536)
+        ])
+        # Group rows by list with one sort instead of a pass per list
+        order = np.argsort(assignment, kind="stable")
+        sizes = np.bincount(assignment, minlength=n_lists)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        self._lists = []
+        for list_id in range(n_lists):
+            rows = np.zeros(max(16, 2 * sizes[list_id]), dtype=np.intp)
+            rows[:sizes[list_id]] = order[starts[list_id]:starts[list_id] + sizes[list_id]]
+            self._lists.append(rows)
+        self._list_sizes = sizes.astype(np.intp)
+        self._list_of = np.full(max(16, 2 * n), -1, dtype=np.intp)
+        self._position_of = np.zeros(len(self._list_of), dtype=np.intp)
+        self._list_of[order] = assignment[order]
+        self._position_of[order] = np.arange(n) - np.repeat(starts, sizes)
+        self._trained_size = n
+
+    def add(self, row: int, vector: np.ndarray) -> None:
+        """Insert or move a row's vector (no-op until the index is trained).
+
+        Args:
+            row: Row of the vector in the owning matrix
+            vector: Unit vector
+        """
+        if not self.ready:
+            return
+        self.remove(row)
+        if row >= len(self._list_of):
+            self._grow_rows(row + 1)
+
+        list_id = int(np.argmax(self._centroids @ vector))
+        position = int(self._list_sizes[list_id])
+        if position == len(self._lists[list_id]):
+            grown = np.zeros(2 * position, dtype=np.intp)
+            grown[:position] = self._lists[list_id]
+            self._lists[list_id] = grown
+        self._lists[list_id][position] = row
+        self._list_sizes[list_id] += 1
+        self._list_of[row] = list_id
+        self._position_of[row] = position
+
+    def remove(self, row: int) -> None:
+        """Remove a row from its list.
+
+        Args:
+            row: Row of the vector in the owning matrix
+        """
+        if row >= len(self._list_of) or self._list_of[row] < 0:
+            return
+        list_id, position = self._list_of[row], self._position_of[row]
+        rows = self._lists[list_id]
+        last = self._list_sizes[list_id] - 1
+        # Fill the gap with the list's last row
+        rows[position] = rows[last]
+        self._position_of[rows[position]] = position
+        self._list_sizes[list_id] = last
+        self._list_of[row] = -1
+
+    def move(self, source: int, target: int) -> None:
+        """Record that the owner moved a vector to another (free) row.
+
+        Args:
+            source: Row the vector was in
+            target: Row it is in now
+        """
+        if source >= len(self._list_of) or self._list_of[source] < 0:
+            return
+        if target >= len(self._list_of):
+            self._grow_rows(target + 1)
+        list_id, position = self._list_of[source], self._position_of[source]
+        self._lists[list_id][position] = target
+        self._list_of[target], self._position_of[target] = list_id, position
+        self._list_of[source] = -1
+
+    def candidates(self, vector: np.ndarray, n_probe: Optional[int] = None) -> np.ndarray:
+        """Get the rows in the lists closest to a query vector.
+
+        Args:
+            vector: Unit query vector
+            n_probe: Override for the number of lists searched
+
+        Returns:
+            Candidate rows to be re-ranked exactly
+        """
+        n_probe = min(n_probe or self.n_probe, len(self._lists))
+        scores = self._centroids @ vector
+        probe = np.argpartition(-scores, n_probe - 1)[:n_probe]
+        return np.concatenate([
+            self._lists[list_id][:self._list_sizes[list_id]] for list_id in probe
+        ])
+
+    def _grow_rows(self, size: int) -> None:
+        """Extend the per-row arrays to hold at least size rows."""
+        capacity = max(size, 2 * len(self._list_of))
+        list_of = np.full(capacity, -1, dtype=np.intp)
+        list_of[:len(self._list_of)] = self._list_of
+        position_of = np.zeros(capacity, dtype=np.intp)
+        position_of[:len(self._position_of)] = self._position_of
+        self._list_of, self._position_of = list_of, position_of
@@ -0,0 +1,146 @@
+"""Concurrency helpers shared by the async request handlers."""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.config import GENERATION_MAX_WORKERS
+
+_executor: Optional[ThreadPoolExecutor] = None
+_store_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the shared bounded executor, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor used for CPU-bound generation and scoring work
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=GENERATION_MAX_WORKERS,
+                    thread_name_prefix="eco-tour-worker",
+                )
+    return _executor
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking function on the shared executor without blocking the event loop.
+
+    Args:
+        func: Function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Result of func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(),
+        functools.partial(func, *args, **kwargs),
+    )
+
+
+def get_store_executor() -> ThreadPoolExecutor:
+    """Get the executor reserved for traveler store operations, creating it on first use.
+
+    Store reads and writes are short compared to itinerary generation, so
+    they get their own thread instead of queueing behind generation work
+    on the shared executor. One thread is enough: the store serialises
+    its operations with a lock anyway.
+
+    Returns:
+        Single-thread ThreadPoolExecutor for traveler store work
+    """
+    global _store_executor
+    if _store_executor is None:
+        with _executor_lock:
+            if _store_executor is None:
+                _store_executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="eco-tour-store",
+                )
+    return _store_executor
+
+
+async def run_store_bound(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a traveler store operation on the store executor.
+
+    Args:
+        func: Function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Result of func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_store_executor(),
+        functools.partial(func, *args, **kwargs),
+    )
+
+
+def shutdown_executor() -> None:
+    """Shut down the executors, waiting for running work to finish."""
+    global _executor, _store_executor
+    with _executor_lock:
+        for executor in (_executor, _store_executor):
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        _store_executor = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one computation.
+
+    While a computation for a key is in flight, later callers with the
+    same key await its result instead of starting their own. Nothing is
+    cached once the computation finishes.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func for key, or join the computation already running for it.
+
+        Args:
+            key: Hashable key identifying identical work
+            func: Zero-argument coroutine function doing the work
+
+        Returns:
+            Result of the (possibly shared) computation
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.shared += 1
+
+        # Shield so one caller disconnecting does not cancel the others
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """Get coalescing counters.
+
+        Returns:
+            Dict with total calls, shared calls and keys in flight
+        """
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._in_flight),
+        }
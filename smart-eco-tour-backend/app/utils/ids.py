@@ -0,0 +1,185 @@
+"""Time-ordered id allocation for generated itineraries."""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from app.config import WORKER_ID_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Ids are 53-bit so they stay exact as JSON numbers in JavaScript clients:
+# 41 bits of milliseconds since EPOCH_MS | 5 bits of worker | 7 bits of sequence
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 5
+SEQUENCE_BITS = 7
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+TIMESTAMP_SHIFT = WORKER_BITS + SEQUENCE_BITS
+
+
+class IdGenerator:
+    """Allocate unique ids that sort by creation time.
+
+    Each id packs a millisecond timestamp, a worker id and a per-millisecond
+    sequence number, so processes with different worker ids never collide
+    and ids from one process increase strictly. If the clock goes backwards
+    or a millisecond's sequence runs out, ids continue from the last
+    timestamp used instead of waiting. Thread-safe.
+
+    Unless one is given, the worker id is claimed by locking one of
+    MAX_WORKER_ID + 1 slot files in a directory shared by the server's
+    processes (e.g. the workers of ``uvicorn --workers N``). A slot stays
+    locked until its process exits, so live processes always hold distinct
+    worker ids; a forked child claims a slot of its own.
+    """
+
+    def __init__(self, worker_id: Optional[int] = None, slot_dir: Optional[Path] = None):
+        """Create a generator.
+
+        Args:
+            worker_id: Fixed worker id in [0, MAX_WORKER_ID] (None claims a
+                free slot in slot_dir)
+            slot_dir: Directory holding the worker id slot files
+        """
+        if worker_id is not None and not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"Worker id must be in [0, {MAX_WORKER_ID}], got {worker_id}")
+
+        self._configured_worker_id = worker_id
+        self._slot_dir = Path(slot_dir) if slot_dir is not None else None
+        self._slot_fd: Optional[int] = None
+        self._pid = None
+        self.worker_id = 0
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._sequence = 0
+
+    def claim(self) -> int:
+        """Claim this process's worker id, if not already done.
+
+        Called at server startup so a full set of slots fails the start
+        rather than the first request; next_id() calls it as well.
+
+        Returns:
+            Worker id
+
+        Raises:
+            RuntimeError: If every worker id slot is held by a live process
+        """
+        with self._lock:
+            return self._claim()
+
+    def release(self) -> None:
+        """Give up the claimed worker id slot (also freed when the process exits)."""
+        with self._lock:
+            if self._slot_fd is not None:
+                os.close(self._slot_fd)
+                self._slot_fd = None
+            self._pid = None
+
+    def _claim(self) -> int:
+        """Claim the worker id for the current process (lock held)."""
+        if self._pid == os.getpid():
+            return self.worker_id
+
+        # A forked child inherits the parent's slot descriptor; drop it
+        # (the parent keeps its lock) and claim a slot of its own
+        if self._slot_fd is not None:
+            os.close(self._slot_fd)
+            self._slot_fd = None
+
+        if self._configured_worker_id is not None:
+            self.worker_id = self._configured_worker_id
+        else:
+            self.worker_id, self._slot_fd = _claim_worker_slot(self._slot_dir)
+        self._pid = os.getpid()
+        return self.worker_id
+
+    def next_id(self) -> int:
+        """Allocate a new id.
+
+        Returns:
+            Id greater than every id previously returned by this generator
+        """
+        with self._lock:
+            self._claim()
+
+            now_ms = int(time.time() * 1000) - EPOCH_MS
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            elif self._sequence < MAX_SEQUENCE:
+                self._sequence += 1
+            else:
+                self._last_ms += 1
+                self._sequence = 0
+            return (self._last_ms << TIMESTAMP_SHIFT) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+
+
+def id_timestamp(item_id: int) -> float:
+    """Get the creation time encoded in an id.
+
+    Args:
+        item_id: Id from IdGenerator
+
+    Returns:
+        Unix timestamp in seconds
+    """
+    return ((item_id >> TIMESTAMP_SHIFT) + EPOCH_MS) / 1000
+
+
+def first_id_at(timestamp: float) -> int:
+    """Get the smallest id that can be allocated at or after a time.
+
+    Args:
+        timestamp: Unix timestamp in seconds
+
+    Returns:
+        Id lower bound for range queries over creation time
+    """
+    return max(0, int(timestamp * 1000) - EPOCH_MS) << TIMESTAMP_SHIFT
+
+
+def _claim_worker_slot(slot_dir: Path) -> Tuple[int, int]:
+    """Lock the first free worker id slot file in a directory.
+
+    Args:
+        slot_dir: Directory holding one lock file per worker id
+
+    Returns:
+        Tuple of (worker id, descriptor of the locked slot file, to be
+        kept open for the life of the process)
+
+    Raises:
+        RuntimeError: If every slot is locked by another process
+    """
+    slot_dir.mkdir(parents=True, exist_ok=True)
+    for worker_id in range(MAX_WORKER_ID + 1):
+        fd = os.open(slot_dir / f"worker-{worker_id}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        if _try_lock(fd):
+            return worker_id, fd
+        os.close(fd)
+    raise RuntimeError(
+        f"All {MAX_WORKER_ID + 1} itinerary worker ids in {slot_dir} are in use; "
+        f"run at most {MAX_WORKER_ID + 1} server processes per WORKER_ID_DIR"
+    )
+
+
+def _try_lock(fd: int) -> bool:
+    """Take an exclusive, non-blocking lock on an open file."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+ITINERARY_IDS = IdGenerator(slot_dir=WORKER_ID_DIR)
@@ -0,0 +1,52 @@
+"""Weighted random sampling helpers."""
+import random
+from typing import List, Sequence
+
+
+class AliasSampler:
+    """Draw indices with probability proportional to fixed weights in O(1).
+
+    Uses Vose's alias method: building the tables is O(n), after which each
+    draw costs one random number and one table lookup.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        """Build the probability and alias tables.
+
+        Args:
+            weights: Non-negative weights, at least one of them positive
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("AliasSampler needs at least one positive weight")
+
+        scaled = [w * n / total for w in weights]
+        self._prob: List[float] = [1.0] * n
+        self._alias: List[int] = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._prob[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left has probability 1 up to rounding error
+
+    def __len__(self) -> int:
+        return len(self._prob)
+
+    def sample(self, rng: random.Random = random) -> int:
+        """Draw one index.
+
+        Args:
+            rng: Random number source (the random module by default)
+
+        Returns:
+            Index into the weights
+        """
+        x = rng.random() * len(self._prob)
+        i = int(x)
+        return i if x - i < self._prob[i] else self._alias[i]
@@ -1,6 +1,30 @@
 """Vector similarity and matching utilities."""
+import heapq
 import math
-from typing import List, Tuple
+import time
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Largest group whose full similarity matrix is built in one go
+GRAM_MAX_SIZE = 2048
+
+# Interest categories, one bit each in an interest mask
+INTEREST_CATEGORIES = [
+    "adventure",
+    "culture",
+    "nature",
+    "food",
+    "local",
+    "luxury",
+    "budget",
+    "relaxation",
+]
+
+# Set bits of every possible interest mask
+_POPCOUNT = [bin(mask).count("1") for mask in range(1 << len(INTEREST_CATEGORIES))]
+_POPCOUNT_ARRAY = np.array(_POPCOUNT, dtype=np.int64)
 
 
 def cosine_similarity(vector1: List[float], vector2: List[float]) -> float:
@@ -97,6 +121,40 @@ def create_profile_vector(
     return normalize_vector(vector)
 
 
+def create_profile_vectors(
+    sustainability_scores: Iterable[float],
+    interest_masks: Iterable[int],
+    days: Iterable[int],
+    budgets: Iterable[float],
+) -> np.ndarray:
+    """Create profile vectors for a batch of travelers at once.
+    
+    Same encoding as create_profile_vector, with interests given as
+    bitmasks and the normalisation done over the whole batch.
+    
+    Args:
+        sustainability_scores: Sustainability preferences (0-100)
+        interest_masks: Interest bitmasks (see interest_mask)
+        days: Trip durations
+        budgets: Budget amounts
+        
+    Returns:
+        Matrix with one normalised profile vector per row
+    """
+    masks = np.fromiter(interest_masks, dtype=np.int64)
+    bits = (masks[:, None] >> np.arange(len(INTEREST_CATEGORIES))) & 1
+    
+    matrix = np.column_stack([
+        np.fromiter(sustainability_scores, dtype=np.float64) / 100.0,
+        np.minimum(np.fromiter(days, dtype=np.float64) / 30.0, 1.0),
+        np.minimum(np.fromiter(budgets, dtype=np.float64) / 10000.0, 1.0),
+        bits.astype(np.float64),
+    ])
+    
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=matrix.copy(), where=norms > 0)
+
+
 def encode_interests(interests: List[str]) -> List[float]:
     """Encode interests as a vector.
     
@@ -106,25 +164,89 @@ def encode_interests(interests: List[str]) -> List[float]:
     Returns:
         Interest encoding vector
     """
-    all_interests = [
-        "adventure",
-        "culture",
-        "nature",
-        "food",
-        "local",
-        "luxury",
-        "budget",
-        "relaxation",
-    ]
+    mask = interest_mask(interests)
+    return [float(mask >> bit & 1) for bit in range(len(INTEREST_CATEGORIES))]
+
+
+@lru_cache(maxsize=1024)
+def _interest_bits(interest: str) -> int:
+    """Bitmask of the categories an interest string mentions."""
+    lowered = interest.lower()
+    mask = 0
+    for bit, category in enumerate(INTEREST_CATEGORIES):
+        if category in lowered:
+            mask |= 1 << bit
+    return mask
+
+
+def interest_mask(interests: Iterable) -> int:
+    """Encode interests as an integer bitmask over INTEREST_CATEGORIES.
+    
+    Args:
+        interests: Interest strings or ActivityType values
+        
+    Returns:
+        Bitmask with bit i set if category i is mentioned
+    """
+    mask = 0
+    for interest in interests:
+        mask |= _interest_bits(str(interest))
+    return mask
+
+
+def interests_in_mask(interests: Iterable, mask: int) -> list:
+    """Keep the interests whose categories are all set in a mask.
     
-    encoding = []
-    for interest in all_interests:
-        if any(interest.lower() in i.lower() for i in interests):
-            encoding.append(1.0)
-        else:
-            encoding.append(0.0)
+    Args:
+        interests: Interest strings or ActivityType values
+        mask: Interest bitmask (e.g. the AND of two travelers' masks)
+        
+    Returns:
+        Matching interests, in their original order
+    """
+    result = []
+    for interest in interests:
+        bits = _interest_bits(str(interest))
+        if bits and bits & mask == bits:
+            result.append(interest)
+    return result
+
+
+def interest_jaccard(mask1: int, mask2: int) -> float:
+    """Jaccard similarity of two interest bitmasks.
+    
+    Args:
+        mask1: First interest bitmask
+        mask2: Second interest bitmask
+        
+    Returns:
+        Shared categories over combined categories (0-1)
+    """
+    union = mask1 | mask2
+    if not union:
+        return 0.0
+    return _POPCOUNT[mask1 & mask2] / _POPCOUNT[union]
+
+
+def interest_jaccard_many(mask: int, masks: Iterable[int]) -> np.ndarray:
+    """Jaccard similarity of one interest bitmask against many.
     
-    return encoding
+    Args:
+        mask: Reference interest bitmask
+        masks: Candidate bitmasks (list or integer array)
+        
+    Returns:
+        Array of similarities (0-1), one per candidate
+    """
+    masks = np.fromiter(masks, dtype=np.int64)
+    shared = _POPCOUNT_ARRAY[masks & mask]
+    combined = _POPCOUNT_ARRAY[masks | mask]
+    return np.divide(
+        shared,
+        combined,
+        out=np.zeros(len(masks), dtype=np.float64),
+        where=combined > 0,
+    )
 
 
 def find_similar_travelers(
@@ -156,6 +278,38 @@ def find_similar_travelers(
     return similarities[:top_k]
 
 
+def pairwise_similarity_matrix(
+    profiles: np.ndarray,
+    method: str = "cosine",
+    other: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Calculate all pairwise similarities from a single Gram matrix.
+    
+    Args:
+        profiles: Matrix of profile vectors (one row per profile)
+        method: Similarity method (cosine or euclidean)
+        other: Optional second matrix; similarities are then profiles x other
+        
+    Returns:
+        Similarity matrix
+    """
+    rows = np.asarray(profiles, dtype=np.float64)
+    cols = rows if other is None else np.asarray(other, dtype=np.float64)
+    gram = rows @ cols.T
+    
+    # Squared norms, shared by both methods
+    row_sq = np.einsum("ij,ij->i", rows, rows)
+    col_sq = row_sq if other is None else np.einsum("ij,ij->i", cols, cols)
+    
+    if method == "cosine":
+        norms = np.sqrt(np.outer(row_sq, col_sq))
+        return np.divide(gram, norms, out=np.zeros_like(gram), where=norms > 0)
+    
+    # Convert distance to similarity
+    squared = np.maximum(row_sq[:, None] + col_sq[None, :] - 2.0 * gram, 0.0)
+    return 1.0 / (1.0 + np.sqrt(squared))
+
+
 def calculate_group_compatibility(
     profiles: List[List[float]],
     method: str = "cosine",
@@ -172,23 +326,115 @@ def calculate_group_compatibility(
     if len(profiles) < 2:
         return 1.0
     
-    similarities = []
+    if len(profiles) > GRAM_MAX_SIZE:
+        return calculate_group_compatibility_blocked(profiles, method)
+    
+    n = len(profiles)
+    similarities = pairwise_similarity_matrix(np.asarray(profiles), method)
+    
+    # Mean over pairs i < j of a symmetric matrix
+    return float((similarities.sum() - np.trace(similarities)) / (n * (n - 1)))
+
+
+def calculate_group_compatibility_blocked(
+    profiles: List[List[float]],
+    method: str = "cosine",
+    block_size: int = 1024,
+) -> float:
+    """Calculate group compatibility without holding the full n x n matrix.
+    
+    Similarities are computed one block_size x block_size tile at a time,
+    so memory stays O(block_size^2) however large the group is.
+    
+    Args:
+        profiles: List (or matrix) of profile vectors
+        method: Similarity method (cosine or euclidean)
+        block_size: Rows per tile
+        
+    Returns:
+        Group compatibility score (0-1)
+    """
+    matrix = np.asarray(profiles, dtype=np.float64)
+    n = len(matrix)
+    if n < 2:
+        return 1.0
     
-    for i in range(len(profiles)):
-        for j in range(i + 1, len(profiles)):
-            if method == "cosine":
-                sim = cosine_similarity(profiles[i], profiles[j])
+    total = 0.0
+    for start in range(0, n, block_size):
+        rows = matrix[start:start + block_size]
+        for other_start in range(start, n, block_size):
+            tile = pairwise_similarity_matrix(
+                rows, method, other=matrix[other_start:other_start + block_size]
+            )
+            if other_start == start:
+                # Diagonal tile: only count pairs i < j
+                total += (tile.sum() - np.trace(tile)) / 2.0
             else:
-                # Convert distance to similarity
-                dist = euclidean_distance(profiles[i], profiles[j])
-                sim = 1.0 / (1.0 + dist)
-            
-            similarities.append(sim)
+                total += tile.sum()
     
-    if not similarities:
-        return 0.0
+    return float(total / (n * (n - 1) / 2))
+
+
+def best_group_subset(
+    profiles: List[List[float]],
+    size: int,
+    anchor: int = 0,
+    beam_width: int = 8,
+    time_budget: float = 0.05,
+    method: str = "cosine",
+) -> Tuple[List[int], float]:
+    """Find the size-k subset with the highest mean pairwise compatibility.
+    
+    Beam search over subsets that contain the anchor profile, using one
+    cached similarity matrix. Each step extends the beam_width best
+    partial groups by their best additions. If the time budget runs out,
+    the best partial group is completed greedily.
+    
+    Args:
+        profiles: List of profile vectors (the candidate pool)
+        size: Number of profiles in the group
+        anchor: Index of the profile every group must contain
+        beam_width: Number of partial groups kept per step
+        time_budget: Maximum search time in seconds
+        method: Similarity method (cosine or euclidean)
+        
+    Returns:
+        Tuple of (sorted profile indices, group compatibility score)
+    """
+    n = len(profiles)
+    if size >= n:
+        return list(range(n)), calculate_group_compatibility(profiles, method)
+    if size < 2:
+        return [anchor], 1.0
+    
+    deadline = time.perf_counter() + time_budget
+    similarities = pairwise_similarity_matrix(np.asarray(profiles), method)
+    
+    def gains_for(members: Tuple[int, ...]) -> np.ndarray:
+        # Similarity each profile would add to the group's pairwise total
+        gains = similarities[list(members)].sum(axis=0)
+        gains[list(members)] = -np.inf
+        return gains
+    
+    beam: List[Tuple[Tuple[int, ...], float]] = [((anchor,), 0.0)]
+    while len(beam[0][0]) < size and time.perf_counter() < deadline:
+        expanded = {}
+        for members, total in beam:
+            gains = gains_for(members)
+            width = min(beam_width, n - len(members))
+            for candidate in np.argpartition(-gains, width - 1)[:width]:
+                key = tuple(sorted(members + (int(candidate),)))
+                expanded[key] = max(expanded.get(key, -np.inf), total + gains[candidate])
+        beam = heapq.nlargest(beam_width, expanded.items(), key=lambda state: state[1])
+    
+    # Out of time: finish the best partial group greedily
+    members, total = beam[0]
+    while len(members) < size:
+        gains = gains_for(members)
+        candidate = int(np.argmax(gains))
+        members, total = tuple(sorted(members + (candidate,))), total + gains[candidate]
     
-    return sum(similarities) / len(similarities)
+    return list(members), float(total / (size * (size - 1) / 2))
 
 
 def recommend_group_size(
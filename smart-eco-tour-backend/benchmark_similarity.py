@@ -0,0 +1,103 @@
+"""Benchmark traveler similarity search: exact scan vs IVF index vs pure Python.
+
+Usage:
+    python benchmark_similarity.py --travelers 100000 --queries 200 --probes 1 2 4 8
+"""
+import argparse
+import random
+import time
+
+from app.services.travelers import TravelerVectorIndex
+from app.utils.ann import IVFIndex
+from app.utils.similarity import create_profile_vector, find_similar_travelers
+
+INTERESTS = ["nature", "culture", "adventure", "local", "food"]
+
+
+def random_vector(rng: random.Random) -> list:
+    """Build a profile vector for a random traveler."""
+    return create_profile_vector(
+        sustainability_score=rng.uniform(30, 100),
+        interests=rng.sample(INTERESTS, rng.randint(1, 3)),
+        days=rng.randint(1, 21),
+        budget=rng.uniform(300, 8000),
+    )
+
+
+def time_queries(search, queries) -> tuple:
+    """Run search over every query and return (results, ms per query)."""
+    start = time.perf_counter()
+    results = [search(q) for q in queries]
+    elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+    return results, elapsed
+
+
+def recall(results, truth, k: int) -> float:
+    """Mean fraction of the true top-k similarities found.
+
+    Profiles often tie, so similarities rather than ids are compared.
+    """
+    total = 0.0
+    for found, expected in zip(results, truth):
+        if not expected:
+            total += 1.0
+            continue
+        cutoff = expected[-1][1] - 1e-6
+        hits = sum(1 for _, sim in found[:k] if sim >= cutoff)
+        total += min(hits, len(expected)) / len(expected)
+    return total / len(truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--travelers", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--lists", type=int, default=0, help="IVF lists (0 = sqrt(n))")
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--python-limit", type=int, default=20000,
+                        help="Skip the pure-Python scan above this many travelers")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"🔧 Building {args.travelers} traveler profiles...")
+    travelers = [(f"traveler_{i}", random_vector(rng)) for i in range(args.travelers)]
+    queries = [random_vector(rng) for _ in range(args.queries)]
+    k = args.top_k
+
+    exact = TravelerVectorIndex(initial_capacity=args.travelers)
+    for traveler_id, vector in travelers:
+        exact.upsert(traveler_id, vector)
+
+    truth, exact_ms = time_queries(
+        lambda q: exact.search(q, args.threshold, k)[0], queries
+    )
+    print(f"\n{'method':<24}{'ms/query':>10}{'recall@' + str(k):>12}")
+    print(f"{'numpy exact':<24}{exact_ms:>10.3f}{1.0:>12.3f}")
+
+    if args.travelers <= args.python_limit:
+        results, python_ms = time_queries(
+            lambda q: find_similar_travelers(q, travelers, args.threshold, k), queries
+        )
+        print(f"{'pure python':<24}{python_ms:>10.3f}{recall(results, truth, k):>12.3f}")
+
+    ann = IVFIndex(n_lists=args.lists, min_size=0)
+    start = time.perf_counter()
+    ann.train(exact._matrix[:len(exact)])
+    print(f"\n🔧 IVF trained with {len(ann._lists)} lists in "
+          f"{time.perf_counter() - start:.2f}s")
+    exact._ann = ann
+
+    for n_probe in args.probes:
+        ann.n_probe = n_probe
+        results, ann_ms = time_queries(
+            lambda q: exact.search(q, args.threshold, k)[0], queries
+        )
+        label = f"ivf (n_probe={n_probe})"
+        print(f"{label:<24}{ann_ms:>10.3f}{recall(results, truth, k):>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -278,6 +278,40 @@ def test_sustainability_tips():
     return True
 
 
+def test_itinerary_job():
+    """Test background itinerary generation jobs."""
+    print_section("10. Background Itinerary Job")
+    
+    request_body = {
+        "origin": "London",
+        "destination": "Paris",
+        "days": 3,
+        "transport_preference": "train",
+        "interests": ["culture", "nature"]
+    }
+    
+    response = requests.post(f"{BASE_URL}/api/jobs/generate-itinerary", json=request_body)
+    job = response.json()
+    print(f"Submitted job: {job.get('job_id')} ({job.get('job_status')})")
+    
+    if response.status_code != 202:
+        return False
+    
+    # Long-poll until the job finishes
+    response = requests.get(f"{BASE_URL}/api/jobs/{job['job_id']}", params={"wait": 30})
+    status = response.json()
+    print(f"Job status: {status.get('job_status')}")
+    
+    if status.get('job_status') != "succeeded":
+        return False
+    
+    response = requests.get(f"{BASE_URL}/api/jobs/{job['job_id']}/result")
+    data = response.json()
+    print(f"Number of itineraries: {len(data.get('itineraries', []))}")
+    
+    return response.status_code == 200
+
+
 def main():
     """Run all tests."""
     print("\n" + "="*70)
@@ -294,6 +328,7 @@ def main():
         ("Find Group Matches", test_find_group_matches),
         ("Compare Itineraries", test_compare_itineraries),
         ("Sustainability Tips", test_sustainability_tips),
+        ("Background Itinerary Job", test_itinerary_job),
     ]
     
     results = []
@@ -0,0 +1,5 @@
+"""Shared test setup."""
+import os
+
+# Keep the LLM cache in memory; tests that need the disk tier pass a path
+os.environ["LLM_CACHE_PATH"] = ""
@@ -0,0 +1,91 @@
+"""Regression tests for bounded activity selection on every destination."""
+import threading
+
+import pytest
+
+from app.config import SUPPORTED_DESTINATIONS
+from app.models.schemas import ActivityType, TransportMode
+from app.services import matching
+from app.services.activity_index import MAX_REJECTIONS
+from app.services.optimizer import optimise_activities
+from app.utils.sampling import AliasSampler
+
+# Hang guard only (seconds); selection used to loop forever on destinations
+# without a catalogue. Work done is asserted through sampler draws instead
+TERMINATION_TIMEOUT = 5.0
+# Most activities drawn for one day (see select_activities)
+MAX_DAY_SLOTS = 5
+
+TRIP_DAYS = (1, 14)
+PREFERENCES = (0.0, 0.5, 1.0)
+INTERESTS = [ActivityType.NATURE, ActivityType.FOOD]
+
+
+def _terminates(func, *args, **kwargs):
+    """Call func and check it returned within TERMINATION_TIMEOUT."""
+    outcome = {}
+
+    def call():
+        outcome["result"] = func(*args, **kwargs)
+
+    # A daemon thread, so a call that never returns fails the test instead
+    # of hanging the run
+    thread = threading.Thread(target=call, daemon=True)
+    thread.start()
+    thread.join(TERMINATION_TIMEOUT)
+    assert not thread.is_alive(), f"{func.__name__} did not terminate"
+    assert "result" in outcome, f"{func.__name__} raised"
+    return outcome["result"]
+
+
+@pytest.fixture
+def sampler_draws(monkeypatch):
+    """Count weighted sampler draws made during a test."""
+    draws = [0]
+    sample = AliasSampler.sample
+
+    def counted(self, *args, **kwargs):
+        draws[0] += 1
+        return sample(self, *args, **kwargs)
+
+    monkeypatch.setattr(AliasSampler, "sample", counted)
+    return draws
+
+
+@pytest.mark.parametrize("destination", SUPPORTED_DESTINATIONS)
+@pytest.mark.parametrize("days", TRIP_DAYS)
+@pytest.mark.parametrize("preference", PREFERENCES)
+def test_select_activities(sampler_draws, destination, days, preference):
+    activities = _terminates(matching.select_activities, destination, days, INTERESTS, preference)
+
+    # At least one activity per day
+    assert len(activities) >= days
+    # Each day's draws are bounded, however small or skewed the catalogue
+    assert sampler_draws[0] <= days * (MAX_DAY_SLOTS + MAX_REJECTIONS)
+
+
+@pytest.mark.parametrize("destination", SUPPORTED_DESTINATIONS)
+@pytest.mark.parametrize("days", TRIP_DAYS)
+@pytest.mark.parametrize("preference", PREFERENCES)
+def test_optimise_activities(destination, days, preference):
+    catalogue = matching.ACTIVITY_INDEX.get(destination)
+
+    plan = _terminates(optimise_activities, catalogue, destination, days, INTERESTS, preference)
+
+    assert len(plan) == days
+    assert all(plan)
+
+
+@pytest.mark.parametrize("optimiser", [True, False])
+@pytest.mark.parametrize("destination", SUPPORTED_DESTINATIONS)
+@pytest.mark.parametrize("days", TRIP_DAYS)
+def test_build_itinerary(monkeypatch, sampler_draws, optimiser, destination, days):
+    monkeypatch.setattr(matching, "ITINERARY_OPTIMIZER_ENABLED", optimiser)
+
+    itinerary = _terminates(
+        matching.build_itinerary, "Berlin", destination, days, TransportMode.TRAIN, INTERESTS
+    )
+
+    assert len(itinerary.days) == days
+    assert all(day.activities for day in itinerary.days)
+    assert sampler_draws[0] <= days * (MAX_DAY_SLOTS + MAX_REJECTIONS)
@@ -0,0 +1,30 @@
+"""Tests for the IVF approximate nearest-neighbour index."""
+import numpy as np
+
+from app.services.travelers import TravelerVectorIndex
+from app.utils.ann import IVFIndex
+
+
+def test_probing_every_list_matches_the_exact_scan():
+    rng = np.random.default_rng(0)
+    ann = IVFIndex(n_lists=16, n_probe=16, min_size=500)
+    index = TravelerVectorIndex(ann=ann)
+    index.upsert_many([f"t{i}" for i in range(1500)], rng.standard_normal((1500, 11)))
+    for i in range(1500, 2000):
+        index.upsert(f"t{i}", rng.standard_normal(11))
+    # Removes move rows, updates move vectors between lists
+    for i in rng.choice(2000, 600, replace=False):
+        index.remove(f"t{i}")
+    for i in range(0, 2000, 7):
+        index.upsert(f"t{i}", rng.standard_normal(11))
+
+    assert ann.ready
+    # Every row sits in exactly one list
+    listed = np.concatenate([rows[:size] for rows, size in zip(ann._lists, ann._list_sizes)])
+    assert sorted(listed) == list(range(len(index)))
+
+    for query in rng.standard_normal((20, 11)):
+        approximate = index.search(query, min_similarity=0.2)
+        exact = index.search(query, min_similarity=0.2, exact=True)
+        assert approximate[1] == exact[1]
+        assert sorted(approximate[0]) == sorted(exact[0])
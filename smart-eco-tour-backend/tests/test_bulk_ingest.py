@@ -0,0 +1,92 @@
+"""Tests for NDJSON bulk traveler ingest."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.main import app
+from app.services.travelers import TravelerStore
+
+
+def _profile(traveler_id: str, destination: str = "Paris", trip_days: int = 5, **fields) -> dict:
+    """Build a valid TravelerProfile payload."""
+    return {
+        "id": traveler_id,
+        "name": f"Traveler {traveler_id}",
+        "destination": destination,
+        "trip_days": trip_days,
+        "sustainability_score_min": 80,
+        "interests": ["nature", "culture"],
+        "transport_preference": "train",
+        **fields,
+    }
+
+
+def _ndjson(*lines) -> bytes:
+    """Join profiles (dicts) and raw lines (str) into an NDJSON body."""
+    return "\n".join(
+        line if isinstance(line, str) else json.dumps(line) for line in lines
+    ).encode("utf-8")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(routes, "TRAVELER_DATABASE", TravelerStore(neighbours_k=4))
+    # Small batches so a request spans several flushes
+    monkeypatch.setattr(routes, "BULK_INGEST_BATCH_SIZE", 2)
+    return TestClient(app)
+
+
+def test_invalid_lines_are_reported_and_the_rest_stored(client):
+    body = _ndjson(
+        _profile("t1"),
+        "{not json",
+        _profile("t2"),
+        "",
+        {"id": "t3", "name": "Missing fields"},
+        _profile("t4", start_date="2025-06-10", end_date="2025-06-01"),
+        _profile("t5"),
+    )
+
+    response = client.post("/api/travelers/bulk", content=body)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["lines"] == 7
+    assert result["stored"] == 3
+    assert result["failed"] == 3
+    assert [error["line"] for error in result["errors"]] == [2, 5, 6]
+    assert sorted(routes.TRAVELER_DATABASE) == ["t1", "t2", "t5"]
+    assert routes.TRAVELER_DATABASE["t1"].profile_vector is not None
+
+
+def test_existing_ids_are_updated(client):
+    client.post("/api/travelers/bulk", content=_ndjson(_profile("t1"), _profile("t2"), _profile("t3")))
+
+    body = _ndjson(
+        _profile("t2", destination="Tokyo", trip_days=10),
+        _profile("t4"),
+        # The last line for an id wins, also within one batch
+        _profile("t3", trip_days=2),
+        _profile("t3", trip_days=3),
+    )
+    result = client.post("/api/travelers/bulk", content=body).json()
+
+    assert result["stored"] == 4
+    assert result["failed"] == 0
+    store = routes.TRAVELER_DATABASE
+    assert len(store) == 4
+    assert store["t2"].destination == "Tokyo"
+    assert store["t2"].trip_days == 10
+    assert store["t3"].trip_days == 3
+    assert store.count(["Paris"]) == 3
+    assert store.count(["Tokyo"]) == 1
+
+    listed = client.get("/api/travelers", params={"fields": "id,destination"}).json()
+    assert listed["count"] == 4
+    assert {t["id"]: t["destination"] for t in listed["travelers"]}["t2"] == "Tokyo"
+
+    # The updated traveler is only matched against their new destination
+    matches = client.post("/api/find-group", params={"traveler_id": "t2", "min_similarity": 0.0}).json()
+    assert matches["matches"] == []
@@ -0,0 +1,45 @@
+"""Tests for batch group formation."""
+import numpy as np
+import pytest
+
+from app.services.grouping import form_groups
+
+
+def _member_averages(vectors: np.ndarray, rows: list) -> np.ndarray:
+    """Average cosine similarity of each member to the rest of its group."""
+    unit = vectors[rows] / np.linalg.norm(vectors[rows], axis=1, keepdims=True)
+    gram = unit @ unit.T
+    return (gram.sum(axis=1) - np.diag(gram)) / (len(rows) - 1)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_every_member_meets_min_similarity(seed):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((600, 12))
+    vectors -= vectors.mean(axis=0)
+    ids = [f"t{i}" for i in range(600)]
+    rows = {traveler_id: i for i, traveler_id in enumerate(ids)}
+
+    groups, unmatched = form_groups(ids, vectors, [6] * 600, min_similarity=0.3, min_group_size=2)
+
+    assert groups
+    for members, _ in groups:
+        assert 2 <= len(members) <= 6
+        assert _member_averages(vectors, [rows[m] for m in members]).min() >= 0.3 - 1e-5
+
+    grouped = [m for members, _ in groups for m in members]
+    assert len(grouped) == len(set(grouped))
+    assert sorted(grouped + unmatched) == sorted(ids)
+
+
+def test_groups_respect_each_travelers_max_size():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 8)) + 3.0
+    max_sizes = rng.integers(2, 6, size=200)
+    ids = [f"t{i}" for i in range(200)]
+    rows = {traveler_id: i for i, traveler_id in enumerate(ids)}
+
+    groups, _ = form_groups(ids, vectors, max_sizes, min_similarity=0.0, min_group_size=2)
+
+    for members, _ in groups:
+        assert all(len(members) <= max_sizes[rows[m]] for m in members)
@@ -0,0 +1,60 @@
+"""Tests for time-ordered itinerary ids."""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.utils.ids import MAX_WORKER_ID, IdGenerator
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+# Claims a worker id, reports it, then holds it until stdin closes
+CLAIM_SCRIPT = """
+import sys
+from app.utils.ids import IdGenerator
+generator = IdGenerator(slot_dir=sys.argv[1])
+print(generator.claim(), generator.next_id(), flush=True)
+sys.stdin.read()
+"""
+
+
+def test_ids_increase_within_a_process(tmp_path):
+    generator = IdGenerator(slot_dir=tmp_path)
+
+    ids = [generator.next_id() for _ in range(1000)]
+
+    assert ids == sorted(set(ids))
+
+
+def test_server_processes_claim_distinct_worker_ids(tmp_path):
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", CLAIM_SCRIPT, str(tmp_path)],
+            cwd=BACKEND_ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(4)
+    ]
+    try:
+        claims = [tuple(map(int, worker.stdout.readline().split())) for worker in workers]
+    finally:
+        for worker in workers:
+            worker.communicate()
+
+    assert sorted(worker_id for worker_id, _ in claims) == [0, 1, 2, 3]
+    assert len({item_id for _, item_id in claims}) == 4
+
+
+def test_slots_are_reused_and_exhaustion_fails(tmp_path):
+    generators = [IdGenerator(slot_dir=tmp_path) for _ in range(MAX_WORKER_ID + 1)]
+    assert sorted(generator.claim() for generator in generators) == list(range(MAX_WORKER_ID + 1))
+
+    with pytest.raises(RuntimeError, match="in use"):
+        IdGenerator(slot_dir=tmp_path).claim()
+
+    # A released slot is claimed again
+    generators[0].release()
+    assert IdGenerator(slot_dir=tmp_path).claim() == generators[0].worker_id
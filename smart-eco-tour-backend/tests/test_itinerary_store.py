@@ -0,0 +1,32 @@
+"""Tests for the generated itinerary store."""
+from app.api.routes import _serialize_itineraries
+from app.models.schemas import ActivityType, TransportMode
+from app.services.itinerary_store import ItineraryStore
+from app.services.matching import build_itinerary
+
+
+def _itinerary(description: str = "Slow travel"):
+    """Build an itinerary without calling the LLM."""
+    itinerary = build_itinerary("Berlin", "Paris", 2, TransportMode.TRAIN, [ActivityType.NATURE])
+    return itinerary.model_copy(update={"description": description})
+
+
+def test_serialized_size_counts_bytes():
+    ascii_only, ascii_size = _serialize_itineraries([_itinerary("Cafe " * 10)])
+    accented, accented_size = _serialize_itineraries([_itinerary("Café " * 10)])
+
+    assert accented[0]["description"] == "Café " * 10
+    # "é" is one character but two bytes in UTF-8
+    assert accented_size == ascii_size + 10
+
+
+def test_trips_are_evicted_by_the_given_size():
+    store = ItineraryStore(max_size=100, max_bytes=1000)
+    first, second = _itinerary(), _itinerary()
+
+    store.put("first", [first], size_bytes=600)
+    store.put("second", [second], size_bytes=600)
+
+    assert store.get(first.id) is None
+    assert store.get(second.id) is not None
+    assert store.stats()["bytes"] == 600
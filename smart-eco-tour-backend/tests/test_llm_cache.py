@@ -0,0 +1,56 @@
+"""Tests for the LLM response cache."""
+import threading
+from types import SimpleNamespace
+
+from app.services import llm
+from app.services.llm_cache import LLMResponseCache
+
+
+def _broken_cache(tmp_path) -> LLMResponseCache:
+    """A disk-backed cache whose table has gone missing."""
+    cache = LLMResponseCache(path=tmp_path / "cache.db")
+    cache._db.execute("DROP TABLE llm_cache")
+    return cache
+
+
+def test_disk_errors_are_misses_and_skipped_writes(tmp_path):
+    cache = _broken_cache(tmp_path)
+
+    assert cache.get("missing") is None
+    cache.set("key", "response")
+    # The memory tier still serves the response
+    assert cache.get("key") == "response"
+    assert cache.stats()["misses"] == 1
+
+
+def test_unopenable_file_falls_back_to_memory(tmp_path):
+    # A directory cannot be opened as a database
+    cache = LLMResponseCache(path=tmp_path)
+
+    cache.set("key", "response")
+    cache.clear()
+    assert cache.get("key") is None
+    assert cache.stats()["disk_enabled"] is False
+
+
+def test_stats_do_not_wait_for_disk(tmp_path):
+    cache = LLMResponseCache(path=tmp_path / "cache.db")
+    cache.set("key", "response")
+
+    # Stand-in for a slow commit holding the connection
+    with cache._db_lock:
+        result = {}
+        reader = threading.Thread(target=lambda: result.update(cache.stats(), hit=cache.get("key")))
+        reader.start()
+        reader.join(5)
+        assert result["hit"] == "response"
+        assert result["writes"] == 1
+
+
+def test_call_groq_returns_response_when_cache_write_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_CACHE", _broken_cache(tmp_path))
+    monkeypatch.setattr(llm, "_groq_configured", lambda: True)
+    client = SimpleNamespace(invoke=lambda messages: SimpleNamespace(content="Day 1: ..."))
+    monkeypatch.setattr(llm, "get_groq_client", lambda timeout: client)
+
+    assert llm.call_groq("Plan a trip") == "Day 1: ..."
@@ -0,0 +1,50 @@
+"""Tests for the itinerary day planner."""
+import itertools
+import random
+
+import pytest
+
+from app.models.schemas import ActivityType
+from app.services.optimizer import build_day_plan, day_value
+
+TYPES = list(ActivityType)
+
+
+def test_single_best_activity_is_not_a_full_day():
+    hours = [3, 3, 3, 3]
+    utilities = [60.0, 40.0, 39.0, 38.0]
+    types = [ActivityType.NATURE] * 4
+
+    # Averaging alone would keep only the best activity
+    assert build_day_plan(hours, utilities, types, [], 10, min_activities=1) == [0]
+    assert sorted(build_day_plan(hours, utilities, types, [], 10, min_activities=3)) == [0, 1, 2]
+
+
+def test_fewer_activities_only_when_no_more_fit():
+    plan = build_day_plan([5, 5, 6], [50.0, 40.0, 30.0], TYPES[:3], [], 10, min_activities=3)
+
+    assert sorted(plan) == [0, 1]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_plans_are_feasible_and_close_to_the_best_mean(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        n = rng.randint(3, 10)
+        hours = [rng.randint(2, 5) for _ in range(n)]
+        utilities = [rng.uniform(20, 60) for _ in range(n)]
+        types = [rng.choice(TYPES) for _ in range(n)]
+        interests = rng.sample(TYPES, 2)
+
+        plan = build_day_plan(hours, utilities, types, interests, 10, min_activities=3, max_activities=4)
+
+        fit = max(r for r in range(5) if sum(sorted(hours)[:r]) <= 10)
+        assert min(3, fit) <= len(plan) <= 4
+        assert sum(hours[i] for i in plan) <= 10
+        best = max(
+            day_value(combination, utilities, types, interests)
+            for size in range(min(3, fit), fit + 1)
+            for combination in itertools.combinations(range(n), size)
+            if sum(hours[i] for i in combination) <= 10
+        )
+        assert day_value(plan, utilities, types, interests) >= 0.9 * best
@@ -0,0 +1,139 @@
+"""Tests for the columnar traveler store."""
+import threading
+
+import numpy as np
+import pytest
+
+from app.models.schemas import TravelerProfile
+from app.services.travelers import TravelerStore, trip_length_bucket
+
+
+def _profiles(count: int, seed: int = 0) -> list:
+    """Random profiles spread over two destinations and all trip lengths."""
+    rng = np.random.default_rng(seed)
+    return [
+        TravelerProfile(
+            id=f"t{i}",
+            name=f"Traveler {i}",
+            destination=["Bali", "Paris"][i % 2],
+            trip_days=int(rng.integers(1, 21)),
+            sustainability_score_min=70,
+            interests=["nature"],
+            transport_preference="train",
+            # Not unit length, so the stored norm matters
+            profile_vector=(rng.standard_normal(6) * 3).tolist(),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("neighbours_k", [0, 5])
+def test_profiles_are_rebuilt_from_the_index(neighbours_k):
+    profiles = _profiles(200)
+    store = TravelerStore(neighbours_k=neighbours_k)
+    store.add_many(profiles[:150])
+    for profile in profiles[150:]:
+        store.add(profile)
+    for profile in profiles[::3]:
+        store.remove(profile.id)
+
+    for profile in profiles:
+        if profile.id not in store:
+            continue
+        stored = store[profile.id]
+        assert stored.trip_days == profile.trip_days
+        assert np.allclose(stored.profile_vector, profile.profile_vector, atol=1e-5)
+
+
+@pytest.mark.parametrize("neighbours_k", [0, 5])
+def test_trip_length_search_matches_brute_force(neighbours_k):
+    profiles = _profiles(300, seed=1)
+    store = TravelerStore(neighbours_k=neighbours_k)
+    store.add_many(profiles)
+    # Moving a traveler to another trip length also moves their bucket
+    store.add(profiles[0].model_copy(update={"trip_days": 30}))
+    by_id = {p.id: p for p in profiles}
+    by_id["t0"] = store["t0"]
+
+    query = profiles[1]
+    matches, total = store.search(
+        query.profile_vector, ["Paris"], min_similarity=0.1, exclude=query.id, trip_days=query.trip_days
+    )
+
+    unit = np.asarray(query.profile_vector) / np.linalg.norm(query.profile_vector)
+    expected = {
+        p.id
+        for p in by_id.values()
+        if p.destination == "Paris"
+        and p.id != query.id
+        and trip_length_bucket(p.trip_days) == trip_length_bucket(query.trip_days)
+        and unit @ (np.asarray(p.profile_vector) / np.linalg.norm(p.profile_vector)) >= 0.1
+    }
+    assert {traveler_id for traveler_id, _ in matches} == expected
+    assert total == len(expected)
+    assert store.count(["Paris"], query.trip_days) == sum(
+        p.destination == "Paris" and trip_length_bucket(p.trip_days) == trip_length_bucket(query.trip_days)
+        for p in by_id.values()
+    )
+
+
+def test_vectors_are_stored_once():
+    profiles = _profiles(1000)
+    stats = {}
+    for dtype in ("float32", "int8"):
+        store = TravelerStore(vector_dtype=dtype)
+        store.add_many(profiles)
+        stats[dtype] = store.stats()
+
+    # One 6-dimensional row per traveler plus a bucket byte, per destination
+    # (each destination index holds 500 travelers in 512 rows)
+    assert stats["float32"]["index_bytes"] == 2 * 512 * (6 * 4 + 1)
+    assert stats["int8"]["index_bytes"] == 2 * 512 * (6 + 1)
+    assert stats["float32"]["total_bytes"] == stats["float32"]["column_bytes"] + stats["float32"]["index_bytes"]
+
+
+def test_stats_do_not_wait_for_the_lock():
+    store = TravelerStore()
+    store.add_many(_profiles(10))
+    held, release = threading.Event(), threading.Event()
+
+    def hold():
+        held.set()
+        release.wait(5)
+
+    writer = threading.Thread(target=store.locked, args=(hold,))
+    writer.start()
+    held.wait(5)
+    try:
+        # /api/health reads stats on the event loop while writes hold the lock
+        assert store.stats()["travelers"] == 10
+    finally:
+        release.set()
+        writer.join()
+
+
+def test_pages_follow_insertion_order_after_updates_and_removes():
+    profiles = _profiles(300, seed=2)
+    store = TravelerStore()
+    store.add_many(profiles[:200])
+    order = [profile.id for profile in profiles[:200]]
+    for profile in profiles[200:]:
+        store.add(profile)
+        order.append(profile.id)
+    # Updates move a traveler to the end; removes leave gaps
+    for profile in profiles[::5]:
+        store.add(profile.model_copy(update={"trip_days": 2}))
+        order.remove(profile.id)
+        order.append(profile.id)
+    for profile in profiles[1::3]:
+        store.remove(profile.id)
+        order.remove(profile.id)
+
+    listed, cursor = [], 0
+    while cursor is not None:
+        page, cursor = store.page(cursor, limit=7)
+        assert len(page) == 7 or cursor is None
+        listed.extend(profile.id for profile in page)
+
+    assert listed == order
+    assert [profile.id for profile in store.page()[0]] == order